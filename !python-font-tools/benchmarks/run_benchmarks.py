@@ -0,0 +1,342 @@
+"""Benchmarks for the hot paths of the font tools, run on the fonts bundled with the repo.
+
+Every benchmark is timed --repeat times (min and median are reported) and
+run once more under tracemalloc for its peak Python heap use. Results are
+written as JSON; with a baseline file, slower or hungrier results are flagged
+and the exit code is 1.
+
+    python run_benchmarks.py                       # print and write results.json (git-ignored)
+    python run_benchmarks.py --save-baseline       # store results as baseline.json
+    python run_benchmarks.py --scale 20            # larger synthetic directories
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# The fonts tools live next to this folder, the sample fonts in the repo root
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = TOOLS_DIR.parent
+BENCH_DIR = Path(__file__).resolve().parent
+
+# Benchmarks must not read from or write to the user's font index
+os.environ['FONT_INDEX_PATH'] = ''
+
+sys.path.insert(0, str(TOOLS_DIR))
+sys.path.insert(0, str(TOOLS_DIR / "font_disassembler"))
+sys.path.insert(0, str(TOOLS_DIR / "one_family_fonts_assembler"))
+import fontTools
+from fontTools.fontBuilder import FontBuilder
+from fontTools.ttLib import TTFont
+from fontTools.ttLib.tables.TupleVariation import TupleVariation
+import font_separator_multiple as disassembler
+import one_family_fonts_assembler as assembler
+from font_common.font_index import read_font_record
+from font_common.sfnt import (extract_collection_member, patch_collection_names, patch_name_table,
+                              read_collection_name_tables, read_name_table)
+
+SAMPLE_FONTS = [
+    "JetBrainsMonoNerdFont.ttf",
+    "JetBrainsMonoNerdFontMono.ttf",
+    "HackNerdFontMono.ttc",
+    "IBMPlexSans.ttc",
+    "SpaceGrotesk.ttc",
+    "RobotoSlab.ttf",
+    "CaskaydiaCoveNerdFont.otf",
+    "CaskaydiaCoveNerdFontMono.otf",
+]
+SAMPLE_COLLECTIONS = [name for name in SAMPLE_FONTS if name.endswith('.ttc')]
+
+# Source of the synthetic variable font, and its named instances
+VARIABLE_SOURCE = "RobotoSlab.ttf"
+VARIABLE_INSTANCES = [(100, "Thin"), (300, "Light"), (400, "Regular"),
+                      (500, "Medium"), (700, "Bold"), (900, "Black")]
+
+# Command-line tools whose startup (interpreter, imports, --help) is timed
+STARTUP_TOOLS = [
+    "font_disassembler/font_separator_multiple.py",
+    "one_family_fonts_assembler/one_family_fonts_assembler.py",
+    "font_pipeline/font_pipeline.py",
+]
+
+DEFAULT_RESULTS = BENCH_DIR / "results.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+# Relative slowdown (or memory growth) reported as a regression, and absolute
+# floors below which differences are treated as noise
+DEFAULT_TOLERANCE = 0.25
+TIME_NOISE_S = 0.002
+MEMORY_NOISE_KB = 64
+
+def build_variable_font(source_path, output_path):
+    """Turn a static TrueType font into a one-axis variable font with named instances."""
+    font = TTFont(str(source_path))
+    builder = FontBuilder(font=font)
+    builder.setupFvar([("wght", 100, 400, 900, "Weight")],
+                      [dict(location=dict(wght=weight), stylename=name)
+                       for weight, name in VARIABLE_INSTANCES])
+    glyf = font['glyf']
+    variations = {}
+    for glyph_name in font.getGlyphOrder():
+        glyph = glyf[glyph_name]
+        if glyph.numberOfContours > 0:
+            points = len(glyph.coordinates) + 4
+            variations[glyph_name] = [TupleVariation({"wght": (0, 1, 1)}, [(5, 3)] * points)]
+    builder.setupGvar(variations)
+    font.save(str(output_path))
+    font.close()
+
+class Workspace:
+    """Temporary copies of the sample fonts plus the synthetic inputs built from them."""
+    def __init__(self, root, scale):
+        self.root = Path(root)
+        self.samples = self.root / "samples"
+        self.samples.mkdir()
+        for name in SAMPLE_FONTS:
+            shutil.copy2(REPO_DIR / name, self.samples / name)
+
+        # A large directory: every sample font copied scale times
+        self.big_dir = self.root / "big_dir"
+        self.big_dir.mkdir()
+        for i in range(scale):
+            for name in SAMPLE_FONTS:
+                path = Path(name)
+                shutil.copy2(self.samples / name, self.big_dir / f"{path.stem}_{i}{path.suffix}")
+
+        # Split members of a collection, as the assembler receives them
+        self.members_dir = self.root / "members"
+        self.members_dir.mkdir()
+        for i in range(len(read_collection_name_tables(self.samples / "IBMPlexSans.ttc"))):
+            extract_collection_member(self.samples / "IBMPlexSans.ttc", i,
+                                      self.members_dir / f"IBMPlexSans-{i}.ttf")
+
+        self.variable_font = self.root / "RobotoSlabVF.ttf"
+        build_variable_font(self.samples / VARIABLE_SOURCE, self.variable_font)
+        self.output_count = 0
+
+    def fresh_dir(self):
+        """Return a new empty output folder."""
+        self.output_count += 1
+        path = self.root / f"out{self.output_count}"
+        path.mkdir()
+        return path
+
+    def fresh_copy(self, name):
+        """Return a new copy of a sample font that may be modified."""
+        path = self.fresh_dir() / name
+        shutil.copy2(self.samples / name, path)
+        return path
+
+def reset_disassembler():
+    """Put every module-level global of the disassembler back into its state at
+    import: single-process, no index, journal, exports or dedup, and no caches
+    left from an earlier run."""
+    disassembler._process_pool = None
+    disassembler._validate_collections = False
+    disassembler._font_index = None
+    disassembler._export = None
+    disassembler._dedup_mode = None
+    disassembler._journal = None
+    disassembler._open_fonts.close()
+    disassembler._variable_sources.clear()
+    disassembler._claimed_names.clear()
+    disassembler._output_digests.clear()
+    disassembler._ledger.clear()
+
+def define_benchmarks(ws):
+    """Return [(name, setup, run)]: setup() prepares one run's arguments, run(args) returns items processed."""
+    def silent(func, *args):
+        # Report lines of the disassembler are buffered and dropped
+        return disassembler.run_logged(func, *args)[0]
+
+    def is_collection_font(_):
+        fonts = sorted(ws.big_dir.iterdir())
+        for font_path in fonts:
+            disassembler.is_collection_font(font_path)
+        return len(fonts)
+
+    def separate_font_collection(output_dirs):
+        count = 0
+        for name, output_dir in zip(SAMPLE_COLLECTIONS, output_dirs):
+            extracted, _ = silent(disassembler.separate_font_collection, ws.samples / name,
+                                  output_dir)
+            count += extracted
+        return count
+
+    def separate_variable_font(output_dir):
+        extracted, _ = silent(disassembler.separate_variable_font, ws.variable_font, output_dir)
+        return extracted
+
+    def get_font_info(_):
+        fonts = sorted(p for p in ws.big_dir.iterdir() if p.suffix.lower() != '.ttc')
+        for font_path in fonts:
+            assembler.get_font_info(font_path)
+        return len(fonts)
+
+    def create_font_collection(output_dir):
+        infos = [assembler.get_font_info(p) for p in sorted(ws.members_dir.iterdir())]
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                assembler.create_font_collection("IBMPlexSans", infos, output_dir / "IBMPlexSans.ttc")
+            finally:
+                sys.stdout = stdout
+        return len(infos)
+
+    def index_record(_):
+        # The index record read per font file on an index miss (editor and assemblers)
+        fonts = sorted(ws.big_dir.iterdir())
+        for font_path in fonts:
+            read_font_record(font_path)
+        return len(fonts)
+
+    def editor_save(font_path):
+        name_table = read_name_table(font_path)
+        name_table.setName("Benchmark", 1, 3, 1, 0x409)
+        patch_name_table(font_path, name_table)
+        return 1
+
+    def editor_save_member(font_path):
+        name_tables = read_collection_name_tables(font_path)
+        name_tables[1].setName("Benchmark", 1, 3, 1, 0x409)
+        patch_collection_names(font_path, {1: name_tables[1]})
+        return 1
+
+    def startup(_):
+        # A fresh interpreter per tool; --help exits right after the imports
+        for tool in STARTUP_TOOLS:
+            subprocess.run([sys.executable, str(TOOLS_DIR / tool), '--help'],
+                           check=True, stdout=subprocess.DEVNULL)
+        return len(STARTUP_TOOLS)
+
+    return [
+        ("startup", lambda: None, startup),
+        ("is_collection_font", lambda: None, is_collection_font),
+        ("separate_font_collection", lambda: [ws.fresh_dir() for _ in SAMPLE_COLLECTIONS],
+         separate_font_collection),
+        ("separate_variable_font", ws.fresh_dir, separate_variable_font),
+        ("get_font_info", lambda: None, get_font_info),
+        ("create_font_collection", ws.fresh_dir, create_font_collection),
+        ("read_font_record", lambda: None, index_record),
+        ("editor_save", lambda: ws.fresh_copy("CaskaydiaCoveNerdFontMono.otf"), editor_save),
+        ("editor_save_member", lambda: ws.fresh_copy("HackNerdFontMono.ttc"), editor_save_member),
+    ]
+
+def run_benchmark(setup, run, repeat):
+    """Time run() repeat times and measure its peak heap once. Returns the result dict."""
+    times = []
+    items = 0
+    for _ in range(repeat):
+        reset_disassembler()
+        args = setup()
+        start = time.perf_counter()
+        items = run(args)
+        times.append(time.perf_counter() - start)
+
+    reset_disassembler()
+    args = setup()
+    tracemalloc.start()
+    try:
+        run(args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'peak_kb': peak / 1024,
+        'items': items,
+    }
+
+def compare(results, baseline, tolerance):
+    """Return {name: status} comparing results against a baseline results dict."""
+    statuses = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            statuses[name] = "NEW"
+            continue
+        problems = []
+        if (result['min_s'] > base['min_s'] * (1 + tolerance)
+                and result['min_s'] - base['min_s'] > TIME_NOISE_S):
+            problems.append(f"time {result['min_s'] / base['min_s']:.2f}x")
+        if (result['peak_kb'] > base['peak_kb'] * (1 + tolerance)
+                and result['peak_kb'] - base['peak_kb'] > MEMORY_NOISE_KB):
+            problems.append(f"memory {result['peak_kb'] / base['peak_kb']:.2f}x")
+        statuses[name] = "REGRESSION " + ", ".join(problems) if problems else "OK"
+    return statuses
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the font tools on the bundled fonts.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    parser.add_argument('--scale', type=int, default=5,
+                        help="Copies of each sample font in the synthetic directory (default: 5)")
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        help="Run only this benchmark (may be repeated)")
+    parser.add_argument('--output', type=Path, default=DEFAULT_RESULTS,
+                        help=f"Results file (default: {DEFAULT_RESULTS.name})")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help=f"Baseline to compare against, if it exists (default: {DEFAULT_BASELINE.name})")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed relative slowdown or memory growth (default: {DEFAULT_TOLERANCE})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="font_bench_") as root:
+        print(f"[INFO] Preparing workspace (scale {args.scale})...")
+        ws = Workspace(root, args.scale)
+        for name, setup, run in define_benchmarks(ws):
+            if args.only and name not in args.only:
+                continue
+            results[name] = run_benchmark(setup, run, args.repeat)
+
+    statuses = compare(results, baseline, args.tolerance) if baseline else {}
+    print()
+    print(f"{'Benchmark':<26}{'Items':>7}{'Min (ms)':>11}{'Median (ms)':>13}{'Peak (KB)':>12}  Status")
+    for name, result in results.items():
+        print(f"{name:<26}{result['items']:>7}{result['min_s'] * 1000:>11.1f}"
+              f"{result['median_s'] * 1000:>13.1f}{result['peak_kb']:>12.0f}  {statuses.get(name, '-')}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'fonttools': fontTools.version,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'scale': args.scale,
+        },
+        'results': results,
+    }
+    output = args.baseline if args.save_baseline else args.output
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] Results written to {output}")
+
+    regressions = [name for name, status in statuses.items() if status.startswith("REGRESSION")]
+    if regressions:
+        print(f"[FAIL] {len(regressions)} regression(s) against {args.baseline.name}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Helpers shared by the font disassembler, assembler and name editor."""
@@ -0,0 +1,43 @@
+"""Crash-safe file writes: write to a temporary file, then rename over the target."""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# mkstemp creates files readable by the owner only; finished files get the
+# usual permissions instead (read once here, as os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _copy_mode(path, tmp_name):
+    """Give the temporary file path's permissions, or the default ones for a new file."""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp_name, mode)
+
+
+@contextmanager
+def atomic_write(path, mode='wb'):
+    """Open a temporary file next to path and move it over path on success.
+
+    If the block raises, the temporary file is removed and path is left
+    untouched, so readers never see a half-written file.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            _copy_mode(path, tmp_name)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,159 @@
+"""Context-managed, memory-bounded access to font files.
+
+Fonts are opened over a read-only memory map where possible, so table data
+is paged in from the OS file cache on demand instead of being read into the
+process, and TTFont only decompiles the tables that are actually accessed.
+Every font opened here is closed when its with-block ends, also on errors.
+"""
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from font_common.sfnt import TTC_TAG, read_table, read_table_directory
+
+# Fonts a FontPool keeps open before closing the least recently used one
+DEFAULT_MAX_OPEN = 16
+
+
+class MappedFile(mmap.mmap):
+    """Read-only memory map of a font file that fontTools can read like a file.
+
+    TTFont.save compares reader.file.name with the target, so the map
+    carries the file's name.
+    """
+    name = None
+
+
+def map_file(path):
+    """Memory-map path read-only, or open it normally if it can't be mapped (e.g. empty)."""
+    with open(path, 'rb') as f:
+        try:
+            mapped = MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return open(path, 'rb')
+    mapped.name = str(path)
+    return mapped
+
+
+def _open(path, font_number=-1, collection=False, **kwargs):
+    from fontTools.ttLib import TTCollection, TTFont
+
+    f = map_file(path)
+    try:
+        if collection:
+            return TTCollection(f, **kwargs)
+        return TTFont(f, fontNumber=font_number, **kwargs)
+    except BaseException:
+        f.close()
+        raise
+
+
+@contextmanager
+def open_font(path, font_number=-1, **kwargs):
+    """Open path as a TTFont over a memory map and close it when the block ends.
+
+    font_number selects a member of a collection; kwargs go to TTFont.
+    """
+    font = _open(path, font_number, **kwargs)
+    try:
+        yield font
+    finally:
+        font.close()
+
+
+@contextmanager
+def mapped_tables(path):
+    """Map a standalone font and yield (sfnt_version, {tag: memoryview}) of its tables.
+
+    The views are only valid inside the block.
+    """
+    f = map_file(path)
+    try:
+        if not isinstance(f, MappedFile):
+            sfnt_version, directory = read_table_directory(f)
+            yield sfnt_version, {tag: read_table(f, directory, tag) for tag in directory}
+            return
+        view = memoryview(f)
+        tables = {}
+        try:
+            sfnt_version, directory = read_table_directory(f)
+            for tag, (offset, length) in directory.items():
+                tables[tag] = view[offset:offset + length]
+            yield sfnt_version, tables
+        finally:
+            # The map can only be closed once no view into it is left
+            for table in tables.values():
+                table.release()
+            view.release()
+    finally:
+        f.close()
+
+
+class FontPool:
+    """Open fonts and collections by path, keeping at most max_open of them open.
+
+    Fonts are handed out by font(), which pins them for the duration of the
+    block; when more than max_open are open, the least recently used
+    unpinned ones are closed. Collections are opened once per path and
+    shared by all their members; a file that changed on disk since it was
+    opened is opened afresh. Use one pool per thread.
+    """
+    def __init__(self, max_open=DEFAULT_MAX_OPEN):
+        self.max_open = max_open
+        self._open = OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get(self, path):
+        stat = os.stat(path)
+        key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            font = self._open.get(key)
+            if font is None:
+                with open(path, 'rb') as f:
+                    collection = f.read(4) == TTC_TAG
+                font = self._open[key] = _open(path, collection=collection)
+            self._open.move_to_end(key)
+            self._pinned[key] = self._pinned.get(key, 0) + 1
+        return key, font
+
+    def _unpin(self, key):
+        with self._lock:
+            self._pinned[key] -= 1
+            if not self._pinned[key]:
+                del self._pinned[key]
+            for lru_key in list(self._open):
+                if len(self._open) <= self.max_open:
+                    break
+                if lru_key not in self._pinned:
+                    self._open.pop(lru_key).close()
+
+    @contextmanager
+    def font(self, path, font_number=-1):
+        """Yield the TTFont of path (member font_number of a collection)."""
+        key, font = self._get(path)
+        try:
+            if hasattr(font, 'fonts'):
+                if font_number < 0:
+                    raise ValueError("Specify a font number for a font collection")
+                yield font.fonts[font_number]
+            else:
+                yield font
+        finally:
+            self._unpin(key)
+
+    def close(self):
+        """Close every font the pool holds."""
+        with self._lock:
+            while self._open:
+                self._open.popitem(last=False)[1].close()
+            self._pinned.clear()
@@ -0,0 +1,266 @@
+"""Persistent on-disk index of font metadata shared by all font tools.
+
+Entries are keyed by absolute path and revalidated by file size and mtime.
+When those change, the file's SHA-256 is checked against the index, so a
+touched, renamed or copied font is still recognised without parsing it.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+from pathlib import Path
+
+from font_common.sfnt import (KIND_COLLECTION, KIND_STATIC, KIND_VARIABLE, classify_font,
+                              decompile_name_table, is_woff, read_collection, read_os2_style,
+                              read_table, read_table_directory)
+
+# Name IDs stored for every font: family, subfamily, full name, version,
+# PostScript name, typographic family and typographic subfamily
+INDEXED_NAME_IDS = (1, 2, 4, 5, 6, 16, 17)
+
+# Stored in every record; records of another version are read again
+RECORD_VERSION = 2
+
+# Set FONT_INDEX_PATH to move the index, or to an empty string to disable it
+INDEX_PATH_ENV = 'FONT_INDEX_PATH'
+
+# Writes are committed in batches to keep large scans fast
+COMMIT_EVERY = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fonts (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    member_count INTEGER NOT NULL,
+    family TEXT,
+    subfamily TEXT,
+    num_glyphs INTEGER NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fonts_sha256 ON fonts (sha256);
+"""
+
+
+def cache_folder():
+    """Return the per-user folder for the tools' caches (not created here)."""
+    if os.name == 'nt':
+        base = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local'))
+    else:
+        base = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+    return base / 'win-fonts'
+
+
+def default_index_path():
+    """Return the index location, or None when disabled through FONT_INDEX_PATH."""
+    configured = os.environ.get(INDEX_PATH_ENV)
+    if configured is not None:
+        return Path(configured) if configured else None
+    return cache_folder() / 'font_index.sqlite3'
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _names_dict(name_table):
+    names = {}
+    if name_table is not None:
+        for name_id in INDEXED_NAME_IDS:
+            text = name_table.getDebugName(name_id)
+            if text is not None:
+                names[str(name_id)] = text
+    return names
+
+
+def _read_num_glyphs(f, tables):
+    if 'maxp' not in tables or tables['maxp'][1] < 6:
+        return 0
+    return struct.unpack('>H', read_table(f, tables, 'maxp')[4:6])[0]
+
+
+def _read_instances(f, tables, name_table):
+    from fontTools.ttLib import newTable
+
+    fvar = newTable('fvar')
+    fvar.decompile(read_table(f, tables, 'fvar'), None)
+    return [{'subfamily': name_table.getDebugName(inst.subfamilyNameID) if name_table else None,
+             'coordinates': dict(inst.coordinates)}
+            for inst in fvar.instances]
+
+
+def _read_woff_record(font_path):
+    """read_font_record for WOFF/WOFF2 fonts, whose tables are compressed, through fontTools."""
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(font_path)
+    try:
+        name_table = font['name'] if 'name' in font else None
+        os2 = font['OS/2'] if 'OS/2' in font else None
+        record = {
+            'version': RECORD_VERSION,
+            'kind': KIND_VARIABLE if 'fvar' in font else KIND_STATIC,
+            'member_count': 1,
+            'num_glyphs': font['maxp'].numGlyphs if 'maxp' in font else 0,
+            'names': [_names_dict(name_table)],
+            'os2': [{'weight_class': os2.usWeightClass, 'fs_selection': os2.fsSelection}
+                    if os2 is not None else None],
+            'instances': [],
+        }
+        if 'fvar' in font:
+            record['instances'] = [
+                {'subfamily': name_table.getDebugName(inst.subfamilyNameID) if name_table else None,
+                 'coordinates': dict(inst.coordinates)}
+                for inst in font['fvar'].instances]
+    finally:
+        font.close()
+    return record
+
+
+def read_font_record(font_path):
+    """Read the indexed metadata of a font file straight from its raw tables.
+
+    Returns a dict with kind, member_count, num_glyphs, names (one dict of
+    name ID -> string per member), os2 (one read_os2_style result per member)
+    and instances (variable fonts only). FontIndex.get adds the file's sha256.
+    """
+    try:
+        font_class = classify_font(font_path)
+    except ValueError:
+        if not is_woff(font_path):
+            raise
+        return _read_woff_record(font_path)
+    record = {
+        'version': RECORD_VERSION,
+        'kind': font_class.kind,
+        'member_count': font_class.count if font_class.is_collection else 1,
+        'num_glyphs': 0,
+        'names': [],
+        'instances': [],
+    }
+    with open(font_path, 'rb') as f:
+        if font_class.kind == KIND_COLLECTION:
+            directories = [tables for _, tables in read_collection(f)]
+        else:
+            directories = [read_table_directory(f)[1]]
+        name_tables = [decompile_name_table(f, tables) for tables in directories]
+        record['names'] = [_names_dict(name_table) for name_table in name_tables]
+        record['os2'] = [read_os2_style(f, tables) for tables in directories]
+        record['num_glyphs'] = _read_num_glyphs(f, directories[0])
+        if font_class.kind == KIND_VARIABLE:
+            record['instances'] = _read_instances(f, directories[0], name_tables[0])
+    return record
+
+
+def record_family(record, member=0):
+    """Preferred family name of a record member (name ID 16, then 1)."""
+    names = record['names'][member] if record['names'] else {}
+    return names.get('16') or names.get('1')
+
+
+def record_os2(record, member=0):
+    """Return (usWeightClass, fsSelection) of a record member, or (None, None)."""
+    os2 = record['os2'][member] if record.get('os2') else None
+    if os2 is None:
+        return None, None
+    return os2['weight_class'], os2['fs_selection']
+
+
+def record_name(record, name_id, member=0):
+    """Return one name string of a record member, or None."""
+    names = record['names'][member] if record['names'] else {}
+    return names.get(str(name_id))
+
+
+class FontIndex:
+    """SQLite-backed cache of read_font_record results."""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open_default(cls):
+        """Open the index at default_index_path(), or return None if disabled or unavailable."""
+        db_path = default_index_path()
+        if db_path is None:
+            return None
+        try:
+            return cls(db_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[WARN] Font index unavailable ({db_path}): {e}")
+            return None
+
+    def get(self, font_path):
+        """Return the metadata record of font_path, reading the font only on a cache miss."""
+        path = str(Path(font_path).resolve())
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, record FROM fonts WHERE path = ?', (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            record = json.loads(row[2])
+            if record.get('version') == RECORD_VERSION:
+                return record
+
+        # Changed, moved or new file: reuse metadata of identical content if known
+        sha256 = file_sha256(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT record FROM fonts WHERE sha256 = ? LIMIT 1', (sha256,)).fetchone()
+        record = json.loads(row[0]) if row else None
+        if record is None or record.get('version') != RECORD_VERSION:
+            record = read_font_record(path)
+        record['sha256'] = sha256
+        self._store(path, stat, sha256, record)
+        return record
+
+    def move(self, old_path, new_path):
+        """Carry the entry of a renamed file over to its new path."""
+        with self._lock:
+            self._conn.execute('DELETE FROM fonts WHERE path = ?', (str(Path(new_path).resolve()),))
+            self._conn.execute('UPDATE fonts SET path = ? WHERE path = ?',
+                               (str(Path(new_path).resolve()), str(Path(old_path).resolve())))
+            self._maybe_commit()
+
+    def forget(self, font_path):
+        """Drop the entry of font_path, e.g. after the tool rewrote the file."""
+        with self._lock:
+            self._conn.execute('DELETE FROM fonts WHERE path = ?', (str(Path(font_path).resolve()),))
+            self._maybe_commit()
+
+    def _store(self, path, stat, sha256, record):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fonts (path, size, mtime_ns, sha256, kind, member_count, '
+                'family, subfamily, num_glyphs, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, sha256, record['kind'],
+                 record['member_count'], record_family(record), record_name(record, 2),
+                 record['num_glyphs'], json.dumps(record)))
+            self._maybe_commit()
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,229 @@
+"""Stage timers, per-file counters and JSON-lines events for the font tools.
+
+Nothing is recorded until configure() is given an events file. Every event
+is one JSON object per line with at least ts, tool, pid and event. Stage
+timings measured in worker processes are collected by timed() and emitted
+by the parent, so only one process ever writes the events file.
+"""
+import cProfile
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from font_common.sfnt import read_table, read_table_directory
+
+# Events file of tools without command-line options (the name editor)
+EVENTS_PATH_ENV = 'FONT_TOOLS_EVENTS'
+
+_lock = threading.Lock()
+_events_file = None
+_tool = None
+_profiler = None
+_profile_path = None
+_slow_seconds = None
+
+# stage -> [count, total seconds], reported by summary()
+_totals = defaultdict(lambda: [0, 0.0])
+
+# Stage records of the task running in this thread, see timed()
+_recording = threading.local()
+
+
+def add_arguments(parser):
+    """Add the shared --events, --profile, --slow-seconds and --non-interactive options."""
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument('--events', metavar='FILE',
+                       help="Append JSON-lines timing and counter events to FILE")
+    group.add_argument('--profile', metavar='FILE',
+                       help="Write cProfile stats of the main thread to FILE")
+    group.add_argument('--slow-seconds', type=float, metavar='S',
+                       help="Mark per-file stages slower than S seconds as slow")
+    group.add_argument('--non-interactive', action='store_true',
+                       help="Never wait for Enter (also implied when stdin is not a terminal)")
+
+
+def configure(tool, events_path=None, profile_path=None, slow_seconds=None):
+    """Start recording for tool. Safe to call with everything disabled."""
+    global _events_file, _tool, _profiler, _profile_path, _slow_seconds
+    _tool = tool
+    _slow_seconds = slow_seconds
+    if events_path:
+        _events_file = open(events_path, 'a', encoding='utf-8')
+    if profile_path:
+        _profile_path = profile_path
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    emit('start', argv=sys.argv[1:])
+
+
+def configure_from_args(tool, args):
+    configure(tool, args.events, args.profile, args.slow_seconds)
+
+
+def configure_from_env(tool):
+    """configure() with the events file named by FONT_TOOLS_EVENTS, if set."""
+    configure(tool, os.environ.get(EVENTS_PATH_ENV))
+
+
+def interactive(args):
+    """True when the tool may wait for the user to press Enter."""
+    return not args.non_interactive and sys.stdin is not None and sys.stdin.isatty()
+
+
+def enabled():
+    return _events_file is not None
+
+
+def emit(event, **fields):
+    """Write one event line (no-op unless an events file is configured)."""
+    if _events_file is None:
+        return
+    record = {'ts': round(time.time(), 6), 'tool': _tool, 'pid': os.getpid(), 'event': event}
+    record.update(fields)
+    line = json.dumps(record, default=str, ensure_ascii=False)
+    with _lock:
+        _events_file.write(line + '\n')
+        _events_file.flush()
+
+
+def record_stage(name, seconds, **fields):
+    """Account a finished stage and emit it, or hand it to timed() inside a task."""
+    recorded = getattr(_recording, 'stages', None)
+    if recorded is not None:
+        recorded.append((name, seconds, fields))
+        return
+    with _lock:
+        totals = _totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+    if _slow_seconds is not None and 'path' in fields and seconds > _slow_seconds:
+        fields['slow'] = True
+    emit('stage', stage=name, seconds=round(seconds, 6), **fields)
+
+
+@contextmanager
+def stage(name, **fields):
+    """Time the block as stage name; fields (e.g. path) are added to its event."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start, **fields)
+
+
+def timed(func, *args):
+    """Run func(*args) while collecting its stage records. Returns (result, records).
+
+    Use as the callable submitted to a process pool, then pass the records
+    to replay() in the parent.
+    """
+    previous = getattr(_recording, 'stages', None)
+    _recording.stages = []
+    try:
+        return func(*args), _recording.stages
+    finally:
+        _recording.stages = previous
+
+
+def replay(records):
+    """Account and emit stage records returned by timed()."""
+    for name, seconds, fields in records:
+        record_stage(name, seconds, **fields)
+
+
+def process_uptime():
+    """Seconds since this process was started, or None where that can't be read.
+
+    Linux reports the start in clock ticks (usually 10 ms).
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/stat', 'rb') as f:
+                # starttime is field 22; the command name before it may contain spaces
+                start_ticks = int(f.read().rsplit(b')', 1)[1].split()[19])
+            with open('/proc/uptime', 'rb') as f:
+                uptime = float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        times = [wintypes.FILETIME() for _ in range(5)]
+        if not kernel32.GetProcessTimes(wintypes.HANDLE(kernel32.GetCurrentProcess()),
+                                        *(ctypes.byref(t) for t in times[:4])):
+            return None
+        kernel32.GetSystemTimeAsFileTime(ctypes.byref(times[4]))
+        created, now = ((t.dwHighDateTime << 32) | t.dwLowDateTime for t in (times[0], times[4]))
+        # FILETIMEs count 100 ns intervals
+        return max(0.0, (now - created) / 1e7)
+    return None
+
+
+def record_startup():
+    """Record the time from process start until now as the 'startup' stage.
+
+    Call once the tool is ready to work, so it covers interpreter start,
+    imports and argument parsing (or building the window).
+    """
+    seconds = process_uptime()
+    if seconds is not None:
+        record_stage('startup', seconds)
+
+
+def font_counters(font_path):
+    """Return {'bytes', 'glyphs'} of a font file; glyphs is None for collections."""
+    counters = {'bytes': os.path.getsize(font_path), 'glyphs': None}
+    try:
+        with open(font_path, 'rb') as f:
+            _, tables = read_table_directory(f)
+            if 'maxp' in tables and tables['maxp'][1] >= 6:
+                counters['glyphs'] = struct.unpack('>H', read_table(f, tables, 'maxp')[4:6])[0]
+    except (OSError, ValueError, struct.error):
+        pass
+    return counters
+
+
+def file_event(stage_name, font_path, **fields):
+    """Emit a per-file counter event (bytes, glyphs) for a font written or read."""
+    if _events_file is None:
+        return
+    emit('file', stage=stage_name, path=str(font_path), **font_counters(font_path), **fields)
+
+
+def summary():
+    """Return {stage: {'count', 'seconds'}} of everything recorded in this process."""
+    with _lock:
+        return {name: {'count': count, 'seconds': round(seconds, 6)}
+                for name, (count, seconds) in sorted(_totals.items())}
+
+
+def print_summary():
+    """Print per-stage totals, if any stages were recorded."""
+    totals = summary()
+    if not totals:
+        return
+    print("[TIMING] Stage totals:")
+    for name, values in totals.items():
+        print(f"    {name:<12} {values['count']:>6} x {values['seconds']:>9.3f} s")
+
+
+def close():
+    """Stop profiling, emit the summary and close the events file."""
+    global _events_file, _profiler
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_profile_path)
+        _profiler = None
+    emit('summary', stages=summary())
+    if _events_file is not None:
+        _events_file.close()
+        _events_file = None
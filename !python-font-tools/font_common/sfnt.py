@@ -0,0 +1,553 @@
+"""Low-level sfnt helpers that work on raw file bytes instead of TTFont objects."""
+import array
+import hashlib
+import io
+import mmap
+import struct
+import sys
+from collections import namedtuple
+
+from font_common.atomic import atomic_write
+
+# Font kinds returned by classify_font
+KIND_STATIC = 'static'
+KIND_VARIABLE = 'variable'
+KIND_COLLECTION = 'collection'
+
+SFNT_VERSIONS = (b'\x00\x01\x00\x00', b'OTTO', b'true')
+TTC_TAG = b'ttcf'
+
+# Compressed web fonts; their tables can't be sliced raw, so they go through fontTools
+WOFF_TAGS = (b'wOFF', b'wOF2')
+
+# head.checkSumAdjustment lives at this offset and must be zero while checksumming
+HEAD_ADJUSTMENT_OFFSET = 8
+CHECKSUM_MAGIC = 0xB1B0AFBA
+
+# head.modified, ignored (with checkSumAdjustment) when comparing font content
+HEAD_MODIFIED_OFFSET = 28
+
+# Tables that don't describe the font itself and are left out of content digests
+DIGEST_IGNORED_TABLES = ('DSIG',)
+
+# array typecode holding unsigned 32-bit values on this platform
+_UINT32 = 'I' if array.array('I').itemsize == 4 else 'L'
+
+
+class FontClass(namedtuple('FontClass', ['kind', 'count'])):
+    """Result of classify_font.
+
+    kind  - KIND_STATIC, KIND_VARIABLE or KIND_COLLECTION
+    count - named instances for variable fonts, members for collections, else 0
+    """
+    __slots__ = ()
+
+    @property
+    def is_collection(self):
+        return self.kind == KIND_COLLECTION
+
+    @property
+    def is_variable(self):
+        return self.kind == KIND_VARIABLE
+
+    @property
+    def splittable(self):
+        """True when the font holds more than one extractable font."""
+        return self.is_collection or (self.is_variable and self.count > 0)
+
+
+def _read_exact(f, offset, size):
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Unexpected end of file")
+    return data
+
+
+def read_directory_entries(f, offset=0):
+    """Read the sfnt table directory at offset, including the stored checksums.
+
+    Returns (sfnt_version, {tag: (checksum, offset, length)}).
+    """
+    header = _read_exact(f, offset, 12)
+    sfnt_version = header[:4]
+    if sfnt_version not in SFNT_VERSIONS:
+        raise ValueError(f"Not an sfnt font (version {sfnt_version!r})")
+    num_tables = struct.unpack('>H', header[4:6])[0]
+    entries = _read_exact(f, offset + 12, num_tables * 16)
+    tables = {}
+    for i in range(num_tables):
+        tag, checksum, table_offset, length = struct.unpack_from('>4sLLL', entries, i * 16)
+        tables[tag.decode('latin-1')] = (checksum, table_offset, length)
+    return sfnt_version, tables
+
+
+def read_table_directory(f, offset=0):
+    """Read the sfnt table directory at offset.
+
+    Returns (sfnt_version, {tag: (offset, length)}).
+    """
+    sfnt_version, entries = read_directory_entries(f, offset)
+    return sfnt_version, {tag: (table_offset, length)
+                          for tag, (_, table_offset, length) in entries.items()}
+
+
+def _collection_offsets(f):
+    header = _read_exact(f, 0, 12)
+    if header[:4] != TTC_TAG:
+        raise ValueError("Not a font collection")
+    num_fonts = struct.unpack('>L', header[8:12])[0]
+    return struct.unpack(f'>{num_fonts}L', _read_exact(f, 12, num_fonts * 4))
+
+
+def read_collection(f):
+    """Read a TTC header and the table directory of every member.
+
+    Returns a list of (sfnt_version, {tag: (offset, length)}), one per member.
+    """
+    return [read_table_directory(f, offset) for offset in _collection_offsets(f)]
+
+
+def read_table(f, tables, tag):
+    """Return the raw bytes of one table from a directory returned by read_table_directory."""
+    offset, length = tables[tag]
+    return _read_exact(f, offset, length)
+
+
+def read_sfnt_tables(font_path):
+    """Read every table of a standalone sfnt font as raw bytes.
+
+    Returns (sfnt_version, {tag: bytes}).
+    """
+    with open(font_path, 'rb') as f:
+        sfnt_version, directory = read_table_directory(f)
+        return sfnt_version, {tag: read_table(f, directory, tag) for tag in directory}
+
+
+def decompile_name_table(f, tables):
+    """Decompile the name table of one directory, or return None if it has none."""
+    from fontTools.ttLib import newTable
+
+    if 'name' not in tables:
+        return None
+    name_table = newTable('name')
+    name_table.decompile(read_table(f, tables, 'name'), None)
+    return name_table
+
+
+def read_name_table(font_path):
+    """Decompile just the name table of a standalone sfnt font.
+
+    WOFF and WOFF2 fonts are compressed, so their name table is read through fontTools.
+    """
+    try:
+        with open(font_path, 'rb') as f:
+            name_table = decompile_name_table(f, read_table_directory(f)[1])
+    except ValueError:
+        if not is_woff(font_path):
+            raise
+        name_table = _read_woff_name_table(font_path)
+    if name_table is None:
+        raise ValueError("Font has no name table")
+    return name_table
+
+
+def read_os2_style(f, tables):
+    """Return {'weight_class', 'fs_selection'} from the OS/2 table, or None without one."""
+    if 'OS/2' not in tables or tables['OS/2'][1] < 64:
+        return None
+    os2 = read_table(f, tables, 'OS/2')
+    return {'weight_class': struct.unpack('>H', os2[4:6])[0],
+            'fs_selection': struct.unpack('>H', os2[62:64])[0]}
+
+
+def read_collection_name_tables(collection_path):
+    """Decompile the name table of every member of a TTC (None for members without one)."""
+    with open(collection_path, 'rb') as f:
+        return [decompile_name_table(f, tables) for _, tables in read_collection(f)]
+
+
+def _fvar_instance_count(f, fvar_entry):
+    """Read instanceCount from the fvar header."""
+    table_offset, length = fvar_entry
+    if length < 16:
+        return 0
+    header = _read_exact(f, table_offset, 16)
+    return struct.unpack('>H', header[12:14])[0]
+
+
+def classify_font(font_path):
+    """Classify a font file by reading only its header, table directory and fvar header.
+
+    Raises ValueError for files that are not sfnt fonts or collections.
+    """
+    with open(font_path, 'rb') as f:
+        return classify_stream(f)
+
+
+def classify_stream(f):
+    """classify_font for an open binary file or in-memory stream."""
+    tag = _read_exact(f, 0, 4)
+    if tag == TTC_TAG:
+        num_fonts = struct.unpack('>L', _read_exact(f, 8, 4))[0]
+        return FontClass(KIND_COLLECTION, num_fonts)
+
+    _, tables = read_table_directory(f)
+    if 'fvar' in tables:
+        return FontClass(KIND_VARIABLE, _fvar_instance_count(f, tables['fvar']))
+    return FontClass(KIND_STATIC, 0)
+
+
+def calc_checksum(data):
+    """Return the sfnt checksum of data: the uint32 big-endian sum, zero padded."""
+    aligned = len(data) - len(data) % 4
+    values = array.array(_UINT32)
+    values.frombytes(data[:aligned])
+    if sys.byteorder == 'little':
+        values.byteswap()
+    total = sum(values)
+    if aligned != len(data):
+        tail = bytes(data[aligned:]).ljust(4, b'\0')
+        total += struct.unpack('>L', tail)[0]
+    return total & 0xFFFFFFFF
+
+
+def _padding(length):
+    return b'\0' * (-length % 4)
+
+
+def sfnt_header(sfnt_version, entries):
+    """Build an sfnt offset table plus directory from (tag, checksum, offset, length) entries."""
+    num_tables = len(entries)
+    entry_selector = max(num_tables.bit_length() - 1, 0)
+    search_range = (1 << entry_selector) * 16
+    range_shift = num_tables * 16 - search_range
+    header = [struct.pack('>4sHHHH', sfnt_version, num_tables,
+                          search_range, entry_selector, range_shift)]
+    for tag, checksum, offset, length in sorted(entries):
+        header.append(struct.pack('>4sLLL', tag.encode('latin-1'), checksum, offset, length))
+    return b''.join(header)
+
+
+def _zero_adjustment(head):
+    head = bytearray(head)
+    head[HEAD_ADJUSTMENT_OFFSET:HEAD_ADJUSTMENT_OFFSET + 4] = b'\0\0\0\0'
+    return head
+
+
+def write_sfnt(f, sfnt_version, tables):
+    """Write a standalone sfnt font to the binary file f.
+
+    tables maps tag -> bytes-like data and is copied verbatim, except that
+    table checksums and head.checkSumAdjustment are recomputed.
+    """
+    tables = dict(tables)
+    if 'head' in tables:
+        tables['head'] = _zero_adjustment(tables['head'])
+
+    tags = sorted(tables)
+    offset = 12 + 16 * len(tags)
+    entries = []
+    for tag in tags:
+        length = len(tables[tag])
+        entries.append((tag, calc_checksum(tables[tag]), offset, length))
+        offset += length + (-length % 4)
+
+    header = sfnt_header(sfnt_version, entries)
+    if 'head' in tables:
+        total = calc_checksum(header) + sum(entry[1] for entry in entries)
+        adjustment = (CHECKSUM_MAGIC - total) & 0xFFFFFFFF
+        struct.pack_into('>L', tables['head'], HEAD_ADJUSTMENT_OFFSET, adjustment)
+
+    f.write(header)
+    for tag in tags:
+        f.write(tables[tag])
+        f.write(_padding(len(tables[tag])))
+
+
+def replace_tables(font_path, new_tables, output_path=None):
+    """Rewrite a standalone sfnt font with some tables replaced.
+
+    new_tables maps tag -> bytes. Every other table is copied as a raw slice
+    of the memory-mapped source, and only the directory, checksums and
+    head.checkSumAdjustment are recomputed. The result replaces output_path
+    (default: font_path) atomically.
+    """
+    with atomic_write(output_path or font_path) as out:
+        with open(font_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sfnt_version, directory = read_table_directory(mm)
+            view = memoryview(mm)
+            tables = {tag: view[offset:offset + length]
+                      for tag, (offset, length) in directory.items()}
+            try:
+                tables.update(new_tables)
+                write_sfnt(out, sfnt_version, tables)
+            finally:
+                # Slices must be gone before the mapping can be closed
+                tables.clear()
+                view.release()
+
+
+def is_woff(font_path):
+    """True for WOFF and WOFF2 files."""
+    with open(font_path, 'rb') as f:
+        return f.read(4) in WOFF_TAGS
+
+
+def _read_woff_name_table(font_path):
+    """Decompile the name table of a WOFF/WOFF2 font through fontTools (None without one)."""
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(font_path)
+    try:
+        return font['name'] if 'name' in font else None
+    finally:
+        font.close()
+
+
+def _save_woff_name_table(font_path, name_table, output_path=None):
+    """Write an edited name table into a WOFF/WOFF2 font through fontTools, keeping its flavor."""
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(font_path)
+    try:
+        font['name'] = name_table
+        data = io.BytesIO()
+        font.save(data)
+    finally:
+        font.close()
+    with atomic_write(output_path or font_path) as out:
+        out.write(data.getvalue())
+
+
+def patch_name_table(font_path, name_table, output_path=None):
+    """Write an edited name table into a font without recompiling any other table.
+
+    WOFF and WOFF2 fonts are recompressed through fontTools instead.
+    """
+    if is_woff(font_path):
+        _save_woff_name_table(font_path, name_table, output_path)
+        return
+    replace_tables(font_path, {'name': name_table.compile(None)}, output_path)
+
+
+def _collection_slices(mm, view, new_tables):
+    """Member tables of a mapped TTC as shared slices, plus their stored checksums."""
+    slices = {}
+    members = []
+    checksums = []
+    for index, member_offset in enumerate(_collection_offsets(mm)):
+        sfnt_version, entries = read_directory_entries(mm, member_offset)
+        replaced = new_tables.get(index, {})
+        tables = {}
+        for tag, (checksum, offset, length) in entries.items():
+            if (offset, length) not in slices:
+                slices[offset, length] = view[offset:offset + length]
+            tables[tag] = slices[offset, length]
+        tables.update(replaced)
+        members.append((sfnt_version, tables))
+        checksums.append({tag: entry[0] for tag, entry in entries.items()
+                          if tag not in replaced})
+    return members, checksums
+
+
+def replace_collection_tables(collection_path, new_tables, output_path=None):
+    """Rewrite a TTC with some tables of some members replaced.
+
+    new_tables maps member index -> {tag: bytes}. Tables that were shared
+    between members stay shared, unchanged tables are copied as raw slices
+    of the memory-mapped source and keep their stored checksums, so the
+    cost is one sequential copy plus checksumming the new tables.
+    """
+    with atomic_write(output_path or collection_path) as out:
+        with open(collection_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            members, checksums = _collection_slices(mm, view, new_tables)
+            try:
+                write_collection(out, members, checksums, hash_tables=False)
+            finally:
+                # Slices must be gone before the mapping can be closed
+                members.clear()
+                view.release()
+
+
+def patch_collection_names(collection_path, name_tables, output_path=None):
+    """Write edited name tables ({member index: name table}) into a TTC."""
+    replace_collection_tables(
+        collection_path,
+        {index: {'name': name_table.compile(None)} for index, name_table in name_tables.items()},
+        output_path)
+
+
+def content_digest(sfnt_version, tables):
+    """Return a hex digest of a font's normalized table content.
+
+    Two fonts with the same digest differ at most in table order, padding,
+    checksums, head.modified and DSIG, so either can stand in for the other.
+    """
+    digest = hashlib.sha256(sfnt_version)
+    for tag in sorted(tables):
+        if tag in DIGEST_IGNORED_TABLES:
+            continue
+        data = tables[tag]
+        if tag == 'head' and len(data) >= HEAD_MODIFIED_OFFSET + 8:
+            data = _zero_adjustment(data)
+            data[HEAD_MODIFIED_OFFSET:HEAD_MODIFIED_OFFSET + 8] = bytes(8)
+        digest.update(struct.pack('>4sL', tag.encode('latin-1'), len(data)))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _mapped_digests(mm, directories):
+    view = memoryview(mm)
+    try:
+        return [content_digest(sfnt_version, {tag: view[offset:offset + length]
+                                              for tag, (offset, length) in directory.items()})
+                for sfnt_version, directory in directories]
+    finally:
+        view.release()
+
+
+def font_digest(font_path):
+    """content_digest of a standalone sfnt font file."""
+    with open(font_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _mapped_digests(mm, [read_table_directory(mm)])[0]
+
+
+def collection_digests(collection_path):
+    """content_digest of every member of a TTC, in member order."""
+    with open(collection_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _mapped_digests(mm, read_collection(mm))
+
+
+def _mapped_checksum_errors(mm):
+    _, entries = read_directory_entries(mm)
+    view = memoryview(mm)
+    try:
+        errors = []
+        total = calc_checksum(view[:12 + 16 * len(entries)])
+        for tag, (checksum, offset, length) in sorted(entries.items()):
+            if offset + length > len(mm):
+                errors.append(tag)
+                continue
+            data = view[offset:offset + length]
+            if tag == 'head':
+                data = _zero_adjustment(data)
+            if calc_checksum(data) != checksum:
+                errors.append(tag)
+            total += checksum
+            data = None
+        head = entries.get('head')
+        if head is not None and not errors and head[2] >= HEAD_ADJUSTMENT_OFFSET + 4:
+            stored = struct.unpack_from('>L', mm, head[1] + HEAD_ADJUSTMENT_OFFSET)[0]
+            if (CHECKSUM_MAGIC - total) & 0xFFFFFFFF != stored:
+                errors.append('checkSumAdjustment')
+        return errors
+    finally:
+        view.release()
+
+
+def checksum_errors(font_path):
+    """Check the stored checksums of a standalone sfnt font against its table data.
+
+    Returns a list of problems (empty when the font is intact): tags whose
+    checksum doesn't match or whose data runs past the end of the file, and
+    'checkSumAdjustment' when the whole-file checksum is off.
+    """
+    with open(font_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _mapped_checksum_errors(mm)
+
+
+def collection_member_bytes(collection_path, index):
+    """Return member index of a TTC as a standalone sfnt font.
+
+    The collection is memory-mapped and table data is copied as raw slices,
+    so no table is ever decompiled.
+    """
+    with open(collection_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        sfnt_version, directory = read_collection(mm)[index]
+        tables = {tag: mm[offset:offset + length] for tag, (offset, length) in directory.items()}
+    output = io.BytesIO()
+    write_sfnt(output, sfnt_version, tables)
+    return output.getvalue()
+
+
+def extract_collection_member(collection_path, index, output_path):
+    """Copy member index of a TTC into a standalone sfnt file."""
+    with open(output_path, 'wb') as out:
+        out.write(collection_member_bytes(collection_path, index))
+
+
+def write_collection(f, members, checksums=None, hash_tables=True):
+    """Write a TrueType Collection to the binary file f.
+
+    members is a list of (sfnt_version, {tag: bytes-like}). Tables with
+    identical content are stored once and every member directory points at
+    the shared copy; only head is kept per member because it carries that
+    member's checkSumAdjustment. With hash_tables=False only tables passed
+    as the same object are shared, which skips hashing when the caller
+    already knows the sharing. checksums optionally holds one {tag: checksum}
+    per member for tables whose checksum is already known.
+
+    Returns the number of bytes saved by sharing tables.
+    """
+    num_fonts = len(members)
+    offset = 12 + 4 * num_fonts
+    member_offsets = []
+    for _, tables in members:
+        member_offsets.append(offset)
+        offset += 12 + 16 * len(tables)
+
+    # Lay out each distinct table once, in first-seen order
+    blobs = []
+    blob_offsets = {}
+    member_entries = []
+    unshared_size = 0
+    for index, (_, tables) in enumerate(members):
+        known = checksums[index] if checksums else {}
+        entries = {}
+        for tag in sorted(tables):
+            data = tables[tag]
+            if tag == 'head':
+                data = _zero_adjustment(data)
+                key = ('head', index)
+            elif hash_tables:
+                key = hashlib.sha256(data).digest()
+            else:
+                key = id(data)
+            padded = len(data) + (-len(data) % 4)
+            unshared_size += padded
+            if key not in blob_offsets:
+                checksum = known.get(tag) if tag != 'head' else None
+                blob_offsets[key] = (offset, calc_checksum(data) if checksum is None else checksum)
+                blobs.append(data)
+                offset += padded
+            table_offset, checksum = blob_offsets[key]
+            entries[tag] = (checksum, table_offset, len(data), data)
+        member_entries.append(entries)
+
+    headers = []
+    for (sfnt_version, _), entries in zip(members, member_entries):
+        header = sfnt_header(sfnt_version, [(tag, checksum, table_offset, length)
+                                            for tag, (checksum, table_offset, length, _) in entries.items()])
+        if 'head' in entries:
+            total = calc_checksum(header) + sum(entry[0] for entry in entries.values())
+            adjustment = (CHECKSUM_MAGIC - total) & 0xFFFFFFFF
+            struct.pack_into('>L', entries['head'][3], HEAD_ADJUSTMENT_OFFSET, adjustment)
+        headers.append(header)
+
+    f.write(struct.pack('>4sLL', TTC_TAG, 0x00010000, num_fonts))
+    f.write(struct.pack(f'>{num_fonts}L', *member_offsets))
+    for header in headers:
+        f.write(header)
+    for data in blobs:
+        f.write(data)
+        f.write(_padding(len(data)))
+
+    return unshared_size - sum(len(data) + (-len(data) % 4) for data in blobs)
@@ -0,0 +1,139 @@
+"""Polling folder watcher for the tools' --watch mode.
+
+The watched folder (not its subfolders) is listed every interval seconds,
+and a file counts as new or changed when its size or modification time
+differs from what was last handed out. Polling needs no extra packages and
+also sees files that other machines drop into a network share, which
+inotify doesn't.
+
+A changed file is only handed out once it has stayed the same for settle
+seconds, so files still being copied are never read half-way, and a burst
+of drops comes out as one batch: changes are held back while other files
+are still changing, for at most max_delay seconds.
+"""
+import os
+import signal
+import time
+from pathlib import Path
+
+# Seconds between two listings of the watched folder
+DEFAULT_INTERVAL = 2.0
+
+# Seconds a file must stay unchanged before it is processed
+DEFAULT_SETTLE = 5.0
+
+# Longest a settled file waits for other files of the same burst
+DEFAULT_MAX_DELAY = 60.0
+
+
+def add_arguments(parser):
+    """Add the shared --watch, --watch-interval and --watch-settle options."""
+    group = parser.add_argument_group("watch mode")
+    group.add_argument('--watch', action='store_true',
+                       help="After the first pass, keep running and process fonts as they are "
+                            "added to or changed in the source folder (Ctrl+C to stop)")
+    group.add_argument('--watch-interval', type=float, default=DEFAULT_INTERVAL, metavar='S',
+                       help=f"Seconds between checks of the folder (default: {DEFAULT_INTERVAL:g})")
+    group.add_argument('--watch-settle', type=float, default=DEFAULT_SETTLE, metavar='S',
+                       help=f"Seconds a file must stay unchanged before it is processed "
+                            f"(default: {DEFAULT_SETTLE:g})")
+
+
+def stop_on_sigterm():
+    """Make SIGTERM (sent by service managers) stop the watch loop like Ctrl+C does."""
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+
+def snapshot(folder, extensions):
+    """Return {path: (size, mtime_ns)} of the files directly in folder with one of extensions."""
+    files = {}
+    try:
+        entries = os.scandir(folder)
+    except FileNotFoundError:
+        return files
+    with entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() not in extensions:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                # Removed between listing and stat
+                continue
+            files[Path(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+class FolderWatcher:
+    """Hands out the new, changed and removed files of one folder in batches.
+
+    The files present when the watcher is created count as known; changes
+    the tool makes itself are reported back with accept() so they don't come
+    back as a batch.
+    """
+    def __init__(self, folder, extensions, interval=DEFAULT_INTERVAL, settle=DEFAULT_SETTLE,
+                 max_delay=DEFAULT_MAX_DELAY):
+        self.folder = Path(folder)
+        self.extensions = {extension.lower() for extension in extensions}
+        self.interval = interval
+        self.settle = settle
+        self.max_delay = max_delay
+        self._known = snapshot(self.folder, self.extensions)
+        # path -> (state, monotonic time the state was first seen) of unsettled changes
+        self._pending = {}
+
+    def accept(self, paths):
+        """Take the current state of paths as known, e.g. after renaming or writing them."""
+        for path in paths:
+            path = Path(path)
+            self._pending.pop(path, None)
+            try:
+                stat = path.stat()
+            except OSError:
+                self._known.pop(path, None)
+                continue
+            self._known[path] = (stat.st_size, stat.st_mtime_ns)
+
+    def wait(self):
+        """Block until a batch is ready and return (changed, removed), both sorted lists of paths."""
+        while True:
+            time.sleep(self.interval)
+            batch = self.poll()
+            if batch is not None:
+                return batch
+
+    def poll(self):
+        """List the folder once; return (changed, removed) if a batch is ready, else None."""
+        current = snapshot(self.folder, self.extensions)
+        now = time.monotonic()
+
+        for path, state in current.items():
+            if self._known.get(path) == state:
+                self._pending.pop(path, None)
+                continue
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != state:
+                self._pending[path] = (state, now)
+        for path in list(self._pending):
+            if path not in current:
+                del self._pending[path]
+
+        removed = sorted(path for path in self._known if path not in current)
+        ready = sorted(path for path, (state, since) in self._pending.items()
+                       if now - since >= self.settle)
+        if not ready and not removed:
+            return None
+        # Hold the batch back while more files of the same burst are still arriving
+        busy = len(self._pending) - len(ready)
+        if busy:
+            oldest = min(self._pending[path][1] for path in ready) if ready else now
+            if now - oldest < self.settle + self.max_delay:
+                return None
+
+        for path in ready:
+            self._known[path] = self._pending.pop(path)[0]
+        for path in removed:
+            del self._known[path]
+        return ready, removed
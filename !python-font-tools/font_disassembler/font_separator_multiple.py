@@ -1,198 +1,561 @@
+import argparse
+import io
 import os
+import random
+import struct
 import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import freeze_support, get_context
 from pathlib import Path
-from fontTools import ttLib
-from fontTools.ttLib import TTFont, TTCollection
-from fontTools.varLib import instancer
+
+# Shared helpers live in !python-font-tools/font_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from font_common import instrument, watch
+from font_common.atomic import atomic_write
+from font_common.font_access import FontPool, open_font
+from font_common.font_index import FontIndex, record_name
+from font_common.sfnt import (FontClass, KIND_COLLECTION, checksum_errors, classify_font,
+                              collection_digests, collection_member_bytes,
+                              decompile_name_table, font_digest, read_collection)
+from journal import ExtractionJournal
+from web_export import ExportSpec, default_cache_dir, export_font, parse_subset
+
+# Module state of a run. benchmarks/run_benchmarks.py:reset_disassembler resets
+# all of it between repetitions; add new globals there too.
+
+# Process pool for CPU-heavy extraction work; None runs everything inline
+_process_pool = None
+
+# Save collection members through fontTools instead of copying raw tables
+_validate_collections = False
+
+# Persistent metadata index (font_common.font_index); None reads headers directly
+_font_index = None
+
+# (ExportSpec, cache folder or None) for WOFF2/subset exports, or None for no exports
+_export = None
+
+# Collections opened by validating saves; at most DEFAULT_MAX_OPEN stay open per process
+_open_fonts = FontPool()
+
+# Source bytes of the variable font being split, see load_variable_source
+_variable_sources = {}
+
+# Output file names already handed out, per output folder
+_claimed_names = defaultdict(set)
+_claimed_lock = threading.Lock()
+
+# Report lines are buffered per job so parallel runs still print depth-first
+_job_output = threading.local()
+
+# Duplicate outputs: None keeps them, 'link' hard-links them to the first
+# identical output, 'skip' leaves them out
+_dedup_mode = None
+
+# Content digest -> first output written with that content (complete files only)
+_output_digests = {}
+_digest_lock = threading.Lock()
+
+# Every splittable source and every output of this run, see record_font.
+# The final verification reads this instead of rescanning the tree.
+_ledger = {}
+_ledger_lock = threading.Lock()
+
+# Journal of completed source fonts (journal.ExtractionJournal), always written by main
+_journal = None
+
+# Outputs re-read by --verify sample
+DEFAULT_VERIFY_SAMPLE = 100
+
+# Files looked at in every folder
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+
+def log(message=""):
+    """Print a report line, or buffer it when running inside a parallel job."""
+    lines = getattr(_job_output, 'lines', None)
+    if lines is None:
+        print(message)
+    else:
+        lines.append(message)
+
+def run_logged(func, *args):
+    """Run func with its report lines buffered. Returns (result, lines)."""
+    previous = getattr(_job_output, 'lines', None)
+    lines = _job_output.lines = []
+    try:
+        return func(*args), lines
+    finally:
+        _job_output.lines = previous
+
+def get_font_class(font_path):
+    """Classify a font from the index or its header, or return None if it can't be read."""
+    try:
+        with instrument.stage('classify', path=str(font_path)):
+            if _font_index is None:
+                return classify_font(font_path)
+            record = _font_index.get(font_path)
+            if record['kind'] == KIND_COLLECTION:
+                return FontClass(KIND_COLLECTION, record['member_count'])
+            return FontClass(record['kind'], len(record['instances']))
+    except (OSError, ValueError, struct.error):
+        return None
 
 def is_collection_font(font_path):
     """Check if a font file is a collection (has multiple fonts inside)."""
+    font_class = get_font_class(font_path)
+    return font_class is not None and font_class.splittable
+
+def claim_output_file(output_dir, safe_name):
+    """Reserve a collision-free output path in output_dir.
+
+    Names are handed out in the order members/instances are planned, so the
+    same source always produces the same file names.
+    """
+    with _claimed_lock:
+        taken = _claimed_names[output_dir]
+        file_name = f"{safe_name}.ttf"
+        counter = 1
+        while file_name.lower() in taken:
+            file_name = f"{safe_name}_{counter}.ttf"
+            counter += 1
+        taken.add(file_name.lower())
+    return output_dir / file_name
+
+def claim_existing_file(path):
+    """Reserve the name of an output kept from an earlier run, e.g. one restored from the journal."""
+    with _claimed_lock:
+        _claimed_names[path.parent].add(path.name.lower())
+
+def record_font(font_path, font_class, source=None):
+    """Add a font to the ledger with its classification (None if it couldn't be read).
+
+    source is the font it was extracted from, or None for fonts found in the tree.
+    """
+    with _ledger_lock:
+        _ledger[font_path] = {'class': font_class, 'source': source, 'extracted': False}
+
+def mark_extracted(font_path):
+    with _ledger_lock:
+        _ledger[font_path]['extracted'] = True
+
+def ledger_outputs(font_path):
+    """Return [(path, source, FontClass or None, extracted)] of everything extracted
+    from font_path, nested outputs included."""
+    with _ledger_lock:
+        entries = list(_ledger.items())
+    children = defaultdict(list)
+    for path, entry in entries:
+        if entry['source'] is not None:
+            children[entry['source']].append((path, entry))
+    outputs = []
+    pending = [font_path]
+    while pending:
+        for path, entry in children.pop(pending.pop(), []):
+            outputs.append((path, entry['source'], entry['class'], entry['extracted']))
+            pending.append(path)
+    return outputs
+
+def forget_outputs(font_path):
+    """Delete everything extracted from font_path so far and release its output names.
+
+    Used before a changed source is extracted again, so it gets the same file
+    names as before and no outputs of its old version are left behind.
+    """
+    outputs = [path for path, _, _, _ in ledger_outputs(font_path)]
+    folders = {font_path.parent / font_path.stem} | {path.parent / path.stem for path in outputs}
+    stale = set(outputs)
+    with _ledger_lock:
+        for path in outputs:
+            _ledger.pop(path, None)
+    with _claimed_lock:
+        for folder in folders:
+            _claimed_names.pop(folder, None)
+    with _digest_lock:
+        for digest, path in list(_output_digests.items()):
+            if path in stale:
+                del _output_digests[digest]
+    for path in outputs:
+        path.unlink(missing_ok=True)
+    # Nested folders first; folders still holding other files stay
+    for folder in sorted(folders, key=lambda folder: len(folder.parts), reverse=True):
+        try:
+            folder.rmdir()
+        except OSError:
+            pass
+
+def verify_outputs(mode, sample_size=DEFAULT_VERIFY_SAMPLE):
+    """Check the run from the ledger, optionally re-reading outputs.
+
+    mode 'ledger' only uses the recorded classifications, 'sample' re-classifies
+    up to sample_size outputs from their headers and 'checksums' checks the
+    table checksums of every output.
+    Returns (collections left unextracted, [(path, problem)]).
+    """
+    with _ledger_lock:
+        entries = dict(_ledger)
+    remaining = sorted(path for path, entry in entries.items()
+                       if entry['class'] is not None and entry['class'].splittable
+                       and not entry['extracted'])
+    outputs = sorted(path for path, entry in entries.items() if entry['source'] is not None)
+    problems = [(path, "unreadable font") for path in outputs if entries[path]['class'] is None]
+    
+    if mode == 'sample':
+        for path in random.sample(outputs, min(sample_size, len(outputs))):
+            try:
+                font_class = classify_font(path)
+            except (OSError, ValueError, struct.error) as e:
+                problems.append((path, str(e)))
+                continue
+            if entries[path]['class'] is not None and font_class != entries[path]['class']:
+                problems.append((path, f"now reads as {font_class.kind}, recorded as "
+                                       f"{entries[path]['class'].kind}"))
+    elif mode == 'checksums':
+        for path in outputs:
+            if entries[path]['class'] is None:
+                continue
+            try:
+                errors = checksum_errors(path)
+            except (OSError, ValueError, struct.error) as e:
+                errors = [str(e)]
+            if errors:
+                problems.append((path, f"bad checksum: {', '.join(errors)}"))
+    return remaining, problems
+
+def known_output(digest):
+    """Return the completed output with this content digest, or None."""
+    with _digest_lock:
+        return _output_digests.get(digest)
+
+def register_output(digest, output_file):
+    """Record a completed output. Returns an earlier identical output, or None if it is the first."""
+    with _digest_lock:
+        existing = _output_digests.setdefault(digest, output_file)
+    return None if existing == output_file else existing
+
+def link_duplicate(existing, output_file):
+    """Replace output_file with a hard link to existing. Returns False if links aren't supported."""
+    temp_file = output_file.with_name(f".{output_file.name}.link")
     try:
-        # Check if it's a TTC file
-        if font_path.suffix.lower() == '.ttc':
-            return True
-        
-        # Check if it's a variable font with instances
-        font = TTFont(str(font_path))
-        has_instances = 'fvar' in font and len(font['fvar'].instances) > 0
-        font.close()
-        
-        if has_instances:
-            return True
-        
-        # Try to open as collection
+        os.link(existing, temp_file)
+        os.replace(temp_file, output_file)
+        return True
+    except OSError:
         try:
-            ttc = TTCollection(str(font_path))
-            if len(ttc.fonts) > 1:
-                ttc.close()
-                return True
-            ttc.close()
-        except:
+            temp_file.unlink()
+        except OSError:
             pass
-        
         return False
+
+def dedup_output(output_file, existing):
+    """Link or drop output_file, which is identical to existing, according to _dedup_mode.
+
+    Returns 'linked', 'skipped', or None when output_file has to be written normally.
+    """
+    if _dedup_mode == 'skip':
+        output_file.unlink(missing_ok=True)
+        log(f"      [DEDUP] {output_file.name}: identical to {existing.parent.name}/{existing.name} (skipped)")
+        return 'skipped'
+    if link_duplicate(existing, output_file):
+        log(f"      [DEDUP] {output_file.name}: identical to {existing.parent.name}/{existing.name} (hard-linked)")
+        return 'linked'
+    return None
+
+def run_tasks(func, task_args):
+    """Run func for each argument tuple in the process pool (or inline) and return results in order."""
+    if _process_pool is None:
+        return [func(*args) for args in task_args]
+    futures = [_process_pool.submit(instrument.timed, func, *args) for args in task_args]
+    results = []
+    for future in futures:
+        result, stages = future.result()
+        instrument.replay(stages)
+        results.append(result)
+    return results
+
+def write_output(output_file, font_data):
+    """Write an extracted font atomically, so an interrupted run never leaves half a file."""
+    with atomic_write(output_file) as f:
+        f.write(font_data)
+
+def save_font(font):
+    """Compile a TTFont into the bytes of a standalone font."""
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+def export_output(font_data, output_file, export):
+    """Write the web exports of an extracted font from its bytes.
+
+    Returns (files written, of which cached), an error message, or None without exports.
+    """
+    if export is None:
+        return None
+    try:
+        with instrument.stage('export', path=str(output_file)):
+            return export_font(font_data, output_file, *export)
     except Exception as e:
-        return False
+        return str(e)
+
+# The save functions below run in worker processes and return
+# (error message or None, result of export_output)
+
+def save_collection_member(font_path, index, output_file, export=None):
+    """Save one collection member through fontTools (validating mode)."""
+    try:
+        with instrument.stage('save', path=str(output_file)):
+            # The collection stays open for its other members
+            with _open_fonts.font(font_path, index) as font:
+                font_data = save_font(font)
+            write_output(output_file, font_data)
+    except Exception as e:
+        return str(e), None
+    return None, export_output(font_data, output_file, export)
+
+def copy_collection_member(font_path, index, output_file, export=None):
+    """Copy one collection member's raw tables into a standalone font."""
+    try:
+        with instrument.stage('save', path=str(output_file)):
+            font_data = collection_member_bytes(font_path, index)
+            write_output(output_file, font_data)
+    except Exception as e:
+        return str(e), None
+    return None, export_output(font_data, output_file, export)
+
+def collection_member_names(font_path):
+    """Return (family, subfamily) for each collection member, read from the raw name tables."""
+    if _font_index is not None:
+        record = _font_index.get(font_path)
+        return [(record_name(record, 1, i) or "Font", record_name(record, 2, i) or f"Variant{i+1}")
+                for i in range(record['member_count'])]
+    
+    names = []
+    with open(font_path, 'rb') as f:
+        for i, (_, tables) in enumerate(read_collection(f)):
+            family = "Font"
+            subfamily = f"Variant{i+1}"
+            name_record = decompile_name_table(f, tables)
+            if name_record is not None:
+                subfamily = name_record.getDebugName(2) or subfamily
+                family = name_record.getDebugName(1) or family
+            names.append((family, subfamily))
+    return names
+
+def load_variable_source(font_path):
+    """Return the raw bytes of a variable font, read from disk once per process.
+
+    Only the most recent source is kept, so memory stays bounded to one
+    variable font plus the instance being built.
+    """
+    stat = os.stat(font_path)
+    key = (str(font_path), stat.st_size, stat.st_mtime_ns)
+    data = _variable_sources.get(key)
+    if data is None:
+        _variable_sources.clear()
+        with open(font_path, 'rb') as f:
+            data = f.read()
+        _variable_sources[key] = data
+    return data
+
+def save_variable_instance(font_path, location, output_file, export=None):
+    """Instantiate a variable font at location and save it."""
+    # Imported on first use: the instancer alone takes longer to import than
+    # most runs without variable fonts take to finish
+    from fontTools.ttLib import TTFont
+    from fontTools.varLib import instancer
+    
+    try:
+        # Each instance starts from a lazily loaded font over the shared bytes:
+        # only the tables the instancer touches get decompiled, the rest are
+        # written back verbatim
+        var_font = TTFont(io.BytesIO(load_variable_source(font_path)))
+        try:
+            with instrument.stage('instantiate', path=str(output_file)):
+                instancer.instantiateVariableFont(var_font, location, inplace=True)
+            with instrument.stage('save', path=str(output_file)):
+                font_data = save_font(var_font)
+                write_output(output_file, font_data)
+        finally:
+            var_font.close()
+    except Exception as e:
+        return str(e), None
+    # Exported from the instance bytes still in memory, not re-read from disk
+    return None, export_output(font_data, output_file, export)
+
+def log_exports(output_file, exports):
+    """Report the result of export_output for one output."""
+    if isinstance(exports, str):
+        log(f"      [WARN] Web export failed for {output_file.name}: {exports}")
+        instrument.emit('error', stage='export', path=str(output_file), error=exports)
+    elif exports is not None:
+        written, cached = exports
+        log(f"      [EXPORT] {output_file.name}: {written} web file(s), {cached} from cache")
 
 def separate_font_collection(font_path, output_dir):
-    """Separate a TrueType Collection (.ttc) into individual .ttf files."""
+    """Separate a TrueType Collection (.ttc) into individual .ttf files.
+
+    Returns (members extracted, members that failed).
+    """
     try:
-        ttc = TTCollection(str(font_path))
+        tasks = []
         count = 0
+        failed = 0
+        digests = collection_digests(font_path) if _dedup_mode else None
         
-        for i, font in enumerate(ttc.fonts):
-            # Try to get the font subfamily name (Bold, Regular, etc.)
-            if 'name' in font:
-                name_record = font['name']
-                subfamily = name_record.getDebugName(2) or f"Variant{i+1}"
-                family = name_record.getDebugName(1) or "Font"
-            else:
-                family = "Font"
-                subfamily = f"Variant{i+1}"
-            
+        # Name each member after its family and subfamily (Bold, Regular, etc.)
+        for i, (family, subfamily) in enumerate(collection_member_names(font_path)):
             # Clean the name for filename
             safe_name = f"{family}-{subfamily}".replace(" ", "").replace("/", "-")
-            output_file = output_dir / f"{safe_name}.ttf"
-            
-            # Avoid overwriting files with same name
-            counter = 1
-            while output_file.exists():
-                output_file = output_dir / f"{safe_name}_{counter}.ttf"
-                counter += 1
+            output_file = claim_output_file(output_dir, safe_name)
             
-            # Save the individual font
-            font.save(str(output_file))
-            print(f"      [OK] Extracted: {output_file.name}")
+            # Members identical to an earlier output are linked or skipped instead of written
+            existing = known_output(digests[i]) if digests else None
+            if existing is not None:
+                outcome = dedup_output(output_file, existing)
+                if outcome == 'linked':
+                    count += 1
+                if outcome is not None:
+                    continue
+            tasks.append((font_path, i, output_file, _export))
+        
+        save_member = save_collection_member if _validate_collections else copy_collection_member
+        
+        for (_, i, output_file, _), (error, exports) in zip(tasks, run_tasks(save_member, tasks)):
+            if error:
+                log(f"      [ERROR] Failed to extract member {i+1}: {error}")
+                instrument.emit('error', stage='save', path=str(output_file), error=error)
+                failed += 1
+                continue
+            if digests:
+                existing = register_output(digests[i], output_file)
+                if existing is not None and dedup_output(output_file, existing) == 'skipped':
+                    continue
+            log(f"      [OK] Extracted: {output_file.name}")
+            log_exports(output_file, exports)
+            instrument.file_event('save', output_file, source=str(font_path))
             count += 1
         
-        ttc.close()
-        return count
+        return count, failed
     except Exception as e:
-        print(f"      [ERROR] Failed to process font collection: {e}")
-        return 0
+        log(f"      [ERROR] Failed to process font collection: {e}")
+        return 0, 1
 
 def separate_variable_font(font_path, output_dir):
-    """Separate a variable font with named instances into individual static .ttf files."""
+    """Separate a variable font with named instances into individual static .ttf files.
+
+    Returns (instances extracted, instances that failed).
+    """
     try:
-        font = TTFont(str(font_path))
-        
-        # Check if it's a variable font with fvar table
-        if 'fvar' not in font:
-            font.close()
-            return 0
-        
-        fvar = font['fvar']
-        instances = fvar.instances
-        
-        if len(instances) == 0:
-            font.close()
-            return 0
-        
-        count = 0
-        
-        # Get family name
-        if 'name' in font:
-            name_record = font['name']
-            family = name_record.getDebugName(1) or "Font"
-        else:
-            family = "Font"
-        
-        font.close()
-        
-        for i, instance in enumerate(instances):
-            # Reload font for each instance
-            var_font = TTFont(str(font_path))
+        # Only fvar and name are decompiled to plan the instances
+        with open_font(font_path) as font:
+            # Check if it's a variable font with fvar table
+            if 'fvar' not in font:
+                return 0, 0
             
-            # Get instance subfamily name
-            subfamily = var_font['name'].getDebugName(instance.subfamilyNameID)
-            if not subfamily:
-                subfamily = f"Instance{i+1}"
+            fvar = font['fvar']
+            instances = fvar.instances
             
-            # Clean the name for filename
-            safe_name = f"{family}-{subfamily}".replace(" ", "").replace("/", "-")
-            output_file = output_dir / f"{safe_name}.ttf"
+            if len(instances) == 0:
+                return 0, 0
             
-            # Avoid overwriting files with same name
-            counter = 1
-            while output_file.exists():
-                output_file = output_dir / f"{safe_name}_{counter}.ttf"
-                counter += 1
+            # Get family name
+            if 'name' in font:
+                name_record = font['name']
+                family = name_record.getDebugName(1) or "Font"
+            else:
+                name_record = None
+                family = "Font"
             
-            try:
-                # Create location dict for this instance
-                location = {axis.axisTag: instance.coordinates[axis.axisTag] 
-                           for axis in var_font['fvar'].axes}
+            tasks = []
+            subfamilies = []
+            for i, instance in enumerate(instances):
+                # Get instance subfamily name
+                subfamily = name_record.getDebugName(instance.subfamilyNameID) if name_record else None
+                if not subfamily:
+                    subfamily = f"Instance{i+1}"
                 
-                # Instantiate the variable font to this location
-                static_font = instancer.instantiateVariableFont(var_font, location)
+                # Clean the name for filename
+                safe_name = f"{family}-{subfamily}".replace(" ", "").replace("/", "-")
                 
-                # Save the static instance
-                static_font.save(str(output_file))
-                print(f"      [OK] Extracted: {output_file.name}")
-                count += 1
-                static_font.close()
-            except Exception as e:
-                print(f"      [ERROR] Failed to instantiate {subfamily}: {e}")
-                var_font.close()
+                # Create location dict for this instance
+                location = {axis.axisTag: instance.coordinates[axis.axisTag] 
+                           for axis in fvar.axes}
+                tasks.append((font_path, location, claim_output_file(output_dir, safe_name), _export))
+                subfamilies.append(subfamily)
+        
+        count = 0
+        failed = 0
+        for (_, _, output_file, _), subfamily, (error, exports) in zip(
+                tasks, subfamilies, run_tasks(save_variable_instance, tasks)):
+            if error:
+                log(f"      [ERROR] Failed to instantiate {subfamily}: {error}")
+                instrument.emit('error', stage='instantiate', path=str(output_file), error=error)
+                failed += 1
                 continue
+            if _dedup_mode:
+                # Instances are only known after instancing, so duplicates are replaced afterwards
+                existing = register_output(font_digest(output_file), output_file)
+                if existing is not None and dedup_output(output_file, existing) == 'skipped':
+                    continue
+            log(f"      [OK] Extracted: {output_file.name}")
+            log_exports(output_file, exports)
+            instrument.file_event('save', output_file, source=str(font_path))
+            count += 1
         
-        return count
+        return count, failed
     except Exception as e:
-        print(f"      [ERROR] Failed to process variable font: {e}")
-        return 0
+        log(f"      [ERROR] Failed to process variable font: {e}")
+        return 0, 1
 
-def extract_font(font_path, output_dir, indent_level=2):
-    """Extract a single font file and return number of variants extracted."""
-    extracted_count = 0
+def extract_font(font_path, output_dir, indent_level=2, font_class=None):
+    """Extract a single font file and return (variants extracted, variants that failed)."""
+    if font_class is None:
+        font_class = get_font_class(font_path)
+    if font_class is None:
+        return 0, 0
     
-    # Check if it's a TTC (collection) or regular TTF
-    if font_path.suffix.lower() == '.ttc':
-        extracted_count = separate_font_collection(font_path, output_dir)
-    else:
-        # Try to separate as variable font first
-        extracted_count = separate_variable_font(font_path, output_dir)
-        
-        # If not a variable font, try as collection
-        if extracted_count == 0:
-            try:
-                extracted_count = separate_font_collection(font_path, output_dir)
-            except:
-                pass
-    
-    return extracted_count
+    if font_class.is_collection:
+        return separate_font_collection(font_path, output_dir)
+    if font_class.is_variable and font_class.count > 0:
+        return separate_variable_font(font_path, output_dir)
+    return 0, 0
 
-def process_single_font(font_path, parent_dir, level=0):
+def process_single_font(font_path, parent_dir, level=0, font_class=None):
     """
     Process a single font file: extract it and recursively process results.
     This ensures depth-first processing - fully complete one font before moving to next.
+    Returns (variants extracted, variants that failed), nested fonts included.
     """
     indent = "  " * level
     total_extracted = 0
     
-    print(f"{indent}[PROCESS] {font_path.name}")
+    log(f"{indent}[PROCESS] {font_path.name}")
     
     # Create folder with same name as font file (without extension)
     folder_name = font_path.stem
     output_dir = parent_dir / folder_name
     output_dir.mkdir(exist_ok=True)
-    print(f"{indent}  [INFO] Created folder: {folder_name}/")
+    log(f"{indent}  [INFO] Created folder: {folder_name}/")
     
     # Extract the font
-    extracted_count = extract_font(font_path, output_dir, level + 2)
+    extracted_count, failed = extract_font(font_path, output_dir, level + 2, font_class)
     
     if extracted_count == 0:
-        print(f"{indent}  [WARN] No variants extracted (single-weight font)")
+        if not failed:
+            log(f"{indent}  [WARN] No variants extracted (single-weight font)")
         try:
             output_dir.rmdir()
         except:
             pass
-        return 0
+        return 0, failed
     
-    print(f"{indent}  [OK] Extracted {extracted_count} variant(s)")
+    log(f"{indent}  [OK] Extracted {extracted_count} variant(s)")
+    mark_extracted(font_path)
     total_extracted += extracted_count
     
     # Process each extracted font in this folder depth-first
-    print(f"{indent}  [INFO] Checking extracted fonts for nested collections...")
+    log(f"{indent}  [INFO] Checking extracted fonts for nested collections...")
     
     # Get all font files in the newly created folder
     extracted_fonts = sorted(list(output_dir.glob("*.ttf")) + 
@@ -202,92 +565,137 @@ def process_single_font(font_path, parent_dir, level=0):
     # Check each extracted font for collections
     nested_total = 0
     for extracted_font in extracted_fonts:
-        if is_collection_font(extracted_font):
-            print(f"{indent}  [FOUND] Nested collection: {extracted_font.name}")
+        extracted_class = get_font_class(extracted_font)
+        record_font(extracted_font, extracted_class, font_path)
+        if extracted_class is not None and extracted_class.splittable:
+            log(f"{indent}  [FOUND] Nested collection: {extracted_font.name}")
             # Recursively process this font completely before moving to next
-            nested_count = process_single_font(extracted_font, output_dir, level + 2)
+            nested_count, nested_failed = process_single_font(extracted_font, output_dir,
+                                                              level + 2, extracted_class)
             nested_total += nested_count
+            failed += nested_failed
     
     if nested_total > 0:
-        print(f"{indent}  [OK] Extracted {nested_total} additional nested variant(s)")
+        log(f"{indent}  [OK] Extracted {nested_total} additional nested variant(s)")
         total_extracted += nested_total
     else:
-        print(f"{indent}  [OK] No nested collections found")
+        log(f"{indent}  [OK] No nested collections found")
     
+    return total_extracted, failed
+
+def restore_from_journal(font_path, entry, level):
+    """Account a source font that an earlier run already extracted."""
+    indent = "  " * level
+    log(f"{indent}[SKIP] {font_path.name}: already extracted ({entry['extracted']} variant(s), journal)")
+    if entry['extracted']:
+        mark_extracted(font_path)
+    for path, source, font_class, extracted in _journal.restore(entry):
+        # Keep a later source with the same stem from taking over these names
+        claim_existing_file(path)
+        record_font(path, font_class, source)
+        if extracted:
+            mark_extracted(path)
+    return entry['extracted']
+
+def process_font_group(font_paths, directory, level, font_classes):
+    """Process fonts that extract into the same folder, one after another."""
+    total_extracted = 0
+    for font_path in font_paths:
+        entry = _journal.completed(font_path) if _journal is not None else None
+        if entry is not None:
+            total_extracted += restore_from_journal(font_path, entry, level)
+        else:
+            extracted, failed = process_single_font(font_path, directory, level,
+                                                    font_classes[font_path])
+            total_extracted += extracted
+            # Only fonts extracted completely (nested fonts included) reach the
+            # journal, so --resume extracts the others again
+            if failed:
+                log(f"{'  ' * level}  [WARN] {failed} variant(s) of {font_path.name} failed; "
+                    f"it will be extracted again with --resume")
+            elif _journal is not None:
+                _journal.record(font_path, extracted, ledger_outputs(font_path))
+        log()
     return total_extracted
 
-def process_directory(directory, level=0):
-    """Process all collection fonts in a directory (non-recursive at this level)."""
+def process_directory(directory, level=0, jobs=1, font_files=None):
+    """Process all collection fonts in a directory (non-recursive at this level).
+    
+    font_files limits the run to those fonts of the directory.
+    """
     indent = "  " * level
     total_extracted = 0
     
     # Find all font files in this directory only (not subdirectories)
-    font_files = (list(directory.glob("*.ttf")) + 
-                 list(directory.glob("*.ttc")) + 
-                 list(directory.glob("*.otf")))
+    if font_files is None:
+        with instrument.stage('scan', directory=str(directory)):
+            font_files = [f for extension in FONT_EXTENSIONS for f in directory.glob(f"*{extension}")]
     
     if len(font_files) == 0:
         return 0
     
-    # Identify collection fonts
-    collection_fonts = [f for f in font_files if is_collection_font(f)]
+    # Identify collection fonts from their headers only
+    font_classes = {f: get_font_class(f) for f in font_files}
+    collection_fonts = [f for f, c in font_classes.items() if c is not None and c.splittable]
+    for font_path in collection_fonts:
+        record_font(font_path, font_classes[font_path])
     
     if len(collection_fonts) == 0:
         if level == 0:
-            print(f"{indent}[INFO] No collection fonts found in this directory")
+            log(f"{indent}[INFO] No collection fonts found in this directory")
         return 0
     
-    print(f"{indent}[INFO] Found {len(collection_fonts)} collection font(s) to extract")
-    print()
+    log(f"{indent}[INFO] Found {len(collection_fonts)} collection font(s) to extract")
+    log()
     
-    # Process each collection font depth-first
+    # Fonts that extract into the same folder (Foo.ttf / Foo.ttc) share one job
+    # so their output names are always claimed in the same order
+    font_groups = defaultdict(list)
     for font_path in sorted(collection_fonts):
-        extracted = process_single_font(font_path, directory, level)
-        total_extracted += extracted
-        print()
-    
-    return total_extracted
-
-def main():
-    print("=" * 80)
-    print("Font Separator - Depth-First Recursive Processing")
-    print("=" * 80)
-    print()
+        font_groups[font_path.stem.lower()].append(font_path)
     
-    # Check for !source+output directory
-    current_dir = Path.cwd()
-    source_output_dir = current_dir / "!source+output"
+    # Process each collection font depth-first. With --dedup the sources run
+    # one after another (their members still use the process pool), so the
+    # copy that is kept is always the first in sorted order, not whichever
+    # job thread got there first
+    if jobs <= 1 or _dedup_mode:
+        for font_paths in font_groups.values():
+            total_extracted += process_font_group(font_paths, directory, level, font_classes)
+        return total_extracted
     
-    if not source_output_dir.exists():
-        print("ERROR: '!source+output' folder not found in the current directory.")
-        print(f"Current directory: {current_dir}")
-        input("\nPress Enter to exit...")
-        sys.exit(1)
-    
-    print(f"[INFO] Source directory: {source_output_dir}")
-    print()
-    print("[START] Beginning depth-first extraction process...")
-    print("=" * 80)
-    print()
-    
-    # Start processing
-    total_extracted = process_directory(source_output_dir)
+    # Run the groups concurrently and print each job's report in order
+    with ThreadPoolExecutor(max_workers=jobs) as threads:
+        futures = [threads.submit(run_logged, process_font_group, font_paths,
+                                  directory, level, font_classes)
+                   for font_paths in font_groups.values()]
+        for future in futures:
+            extracted, lines = future.result()
+            for line in lines:
+                print(line)
+            total_extracted += extracted
     
+    return total_extracted
+
+def print_results(source_output_dir, total_extracted, args):
+    """Verify the run and print the summary."""
     # Final verification
     print("=" * 80)
     print("[VERIFY] Performing final verification...")
     print("=" * 80)
     
-    all_fonts = (list(source_output_dir.rglob("*.ttf")) + 
-                list(source_output_dir.rglob("*.ttc")) + 
-                list(source_output_dir.rglob("*.otf")))
-    remaining_collections = [f for f in all_fonts if is_collection_font(f)]
+    with instrument.stage('verify', mode=args.verify):
+        remaining_collections, problems = verify_outputs(args.verify, args.verify_sample)
+    outputs = sum(1 for entry in _ledger.values() if entry['source'] is not None)
+    print(f"[VERIFY] Mode: {args.verify}, {outputs} output(s) recorded")
     
     print()
     print("=" * 80)
     print("SUMMARY")
     print("=" * 80)
     print(f"[RESULT] Total variants extracted: {total_extracted}")
+    if _journal.resumed_fonts:
+        print(f"[RESULT] Resumed: {_journal.resumed_fonts} font(s) with "
+              f"{_journal.resumed_variants} variant(s) were done by an earlier run")
     print(f"[OUTPUT] Location: {source_output_dir}")
     
     if len(remaining_collections) > 0:
@@ -300,9 +708,185 @@ def main():
         print(f"\n[SUCCESS] All fonts have been fully extracted to single fonts.")
         print("[OK] No collection fonts remain - all fonts are now individual files.")
     
+    if problems:
+        print(f"\n[WARN] {len(problems)} output(s) failed verification:")
+        for font, problem in problems:
+            print(f"    - {font.relative_to(source_output_dir)}: {problem}")
+    
     print("=" * 80)
+
+def watch_directory(directory, jobs, watcher):
+    """Extract the fonts dropped into directory, batch by batch, until Ctrl+C.
+
+    watcher is created before the first pass, so fonts dropped while it ran
+    come up in the first batch.
+    """
+    watch.stop_on_sigterm()
+    print()
+    print(f"[WATCH] Watching {directory} for new or changed fonts (Ctrl+C to stop)...")
+    print()
+    batches = 0
+    total_extracted = 0
+    busy = False
+    try:
+        while True:
+            changed, removed = watcher.wait()
+            for font_path in removed:
+                print(f"[WATCH] Removed: {font_path.name} (its extracted fonts are left in place)")
+            if not changed:
+                continue
+            
+            # Fonts sharing an output folder with a changed font are extracted again with it
+            stems = {font_path.stem.lower() for font_path in changed}
+            font_files = sorted(font_path for font_path in watch.snapshot(directory, FONT_EXTENSIONS)
+                                if font_path.stem.lower() in stems)
+            print("=" * 80)
+            print(f"[WATCH] {len(changed)} new or changed font(s): "
+                  f"{', '.join(font_path.name for font_path in changed)}")
+            print("=" * 80)
+            print()
+            busy = True
+            with instrument.stage('watch_batch', fonts=len(font_files)):
+                for font_path in font_files:
+                    forget_outputs(font_path)
+                extracted = process_directory(directory, jobs=jobs, font_files=font_files)
+            busy = False
+            # Collections of this batch may change again before the next one
+            _open_fonts.close()
+            
+            batches += 1
+            total_extracted += extracted
+            remaining, _ = verify_outputs('ledger')
+            print(f"[WATCH] Batch {batches} done: {extracted} variant(s) extracted, "
+                  f"{len(remaining)} collection font(s) remain")
+            print()
+    except KeyboardInterrupt:
+        print()
+        if busy:
+            print("[INFO] Extraction was interrupted. Run again with --resume to continue "
+                  "with the fonts that are not finished yet.")
+        print(f"[WATCH] Stopped after {batches} batch(es), {total_extracted} variant(s) extracted.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Split font collections and variable fonts in '!source+output' into single fonts.")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU, default: 1)")
+    parser.add_argument('--no-index', action='store_true',
+                        help="Don't use the persistent font metadata index")
+    parser.add_argument('--validate', action='store_true',
+                        help="Rebuild collection members through fontTools instead of copying raw tables")
+    parser.add_argument('--dedup', choices=['link', 'skip'],
+                        help="Hard-link (link) or leave out (skip) outputs whose table content "
+                             "matches an earlier output")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip source fonts that an earlier (interrupted) run already "
+                             "extracted completely, according to its journal")
+    parser.add_argument('--woff2', action='store_true',
+                        help="Also export every extracted font as WOFF2 into a 'web' folder next to it")
+    parser.add_argument('--subset', action='append', default=[], metavar='NAME=RANGES',
+                        help="Export a Unicode-range subset into the 'web' folder, e.g. "
+                             "latin=U+0000-00FF,U+0131 (may be repeated)")
+    parser.add_argument('--no-export-cache', action='store_true',
+                        help="Don't reuse or store exports in the export cache")
+    parser.add_argument('--verify', choices=['ledger', 'sample', 'checksums'], default='ledger',
+                        help="Final verification: recorded results only (ledger, default), re-read "
+                             "a random sample of outputs (sample) or check every output's "
+                             "table checksums (checksums)")
+    parser.add_argument('--verify-sample', type=int, default=DEFAULT_VERIFY_SAMPLE, metavar='N',
+                        help=f"Outputs re-read by --verify sample (default: {DEFAULT_VERIFY_SAMPLE})")
+    watch.add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        args.subset = [parse_subset(text) for text in args.subset]
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def main():
+    global _process_pool, _validate_collections, _font_index, _dedup_mode, _export, _journal
+    args = parse_args()
+    _validate_collections = args.validate
+    _dedup_mode = args.dedup
+    if args.woff2 or args.subset:
+        _export = (ExportSpec(args.woff2, args.subset),
+                   None if args.no_export_cache else default_cache_dir())
+    instrument.configure_from_args("font_disassembler", args)
+    instrument.record_startup()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
-    input("\nPress Enter to exit...")
+    print("=" * 80)
+    print("Font Separator - Depth-First Recursive Processing")
+    print("=" * 80)
+    print()
+    
+    # Check for !source+output directory
+    current_dir = Path.cwd()
+    source_output_dir = current_dir / "!source+output"
+    
+    if not source_output_dir.exists():
+        print("ERROR: '!source+output' folder not found in the current directory.")
+        print(f"Current directory: {current_dir}")
+        instrument.close()
+        if instrument.interactive(args):
+            input("\nPress Enter to exit...")
+        sys.exit(1)
+    
+    print(f"[INFO] Source directory: {source_output_dir}")
+    print(f"[INFO] Worker processes: {jobs}")
+    print(f"[INFO] Collection mode: {'validate (fontTools rebuild)' if args.validate else 'raw table copy'}")
+    print(f"[INFO] Duplicate outputs: {args.dedup or 'kept'}")
+    if _export is not None:
+        formats = "WOFF2" if args.woff2 else "TrueType/OpenType"
+        subsets = ", ".join(name for name, _ in args.subset) or "full font"
+        print(f"[INFO] Web export: {formats} ({subsets}), cache: {_export[1] or 'off'}")
+    print()
+    print("[START] Beginning depth-first extraction process...")
+    print("=" * 80)
+    print()
+    
+    # Start processing
+    if not args.no_index:
+        _font_index = FontIndex.open_default()
+    if jobs > 1:
+        # Workers are started on demand from the job threads; forking a
+        # process that runs threads can deadlock, so they are spawned
+        _process_pool = ProcessPoolExecutor(max_workers=jobs, mp_context=get_context('spawn'))
+    _journal = ExtractionJournal(source_output_dir, resume=args.resume)
+    # Snapshot the folder before the first pass lists it, so nothing dropped meanwhile is missed
+    watcher = (watch.FolderWatcher(source_output_dir, FONT_EXTENSIONS, args.watch_interval,
+                                   args.watch_settle) if args.watch else None)
+    try:
+        try:
+            total_extracted = process_directory(source_output_dir, jobs=jobs)
+        except BaseException:
+            print("\n[INFO] Extraction was interrupted. Run again with --resume to continue "
+                  "with the fonts that are not finished yet.")
+            raise
+        _open_fonts.close()
+        print_results(source_output_dir, total_extracted, args)
+        
+        # The worker pool, font index and journal stay open between batches
+        if args.watch:
+            watch_directory(source_output_dir, jobs, watcher)
+    finally:
+        if _process_pool is not None:
+            _process_pool.shutdown()
+            _process_pool = None
+        _open_fonts.close()
+        _journal.close()
+        if _font_index is not None:
+            _font_index.close()
+            _font_index = None
+    
+    if instrument.enabled():
+        instrument.print_summary()
+    instrument.close()
+    
+    if instrument.interactive(args) and not args.watch:
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
+    freeze_support()
     main()
@@ -0,0 +1,109 @@
+"""Journal of completed extractions, so an interrupted run can be resumed.
+
+The journal lives in the source folder. A line is appended (and synced to
+disk) as soon as a source font and everything nested in it has been
+extracted:
+
+    {"source": "Foo.ttc", "size": ..., "mtime_ns": ..., "extracted": 6,
+     "outputs": [{"path": "Foo/Foo-Bold.ttf", "source": "Foo.ttc",
+                  "kind": "static", "count": 0, "extracted": false}, ...]}
+
+Paths are relative to the source folder; later lines win. A source counts
+as done only while it is unchanged and all of its outputs still exist.
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from font_common.sfnt import FontClass
+
+JOURNAL_NAME = ".font_separator.journal"
+
+class ExtractionJournal:
+    """Completed source fonts of the current and (when resuming) earlier runs."""
+    def __init__(self, root, resume=False):
+        self.root = Path(root)
+        self.path = self.root / JOURNAL_NAME
+        self._done = {}
+        self._lock = threading.Lock()
+        self.resumed_fonts = 0
+        self.resumed_variants = 0
+        if resume:
+            self._load()
+        # A fresh run starts a fresh journal, so it only lists what this run wrote
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                self._done[entry['source']] = entry
+            except (ValueError, KeyError, TypeError):
+                # A crash while appending leaves at most one broken last line
+                continue
+
+    def _relative(self, path):
+        return Path(path).relative_to(self.root).as_posix()
+
+    def completed(self, source_path):
+        """Return the journal entry of source_path if it needs no work, else None."""
+        entry = self._done.get(self._relative(source_path))
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (entry['size'], entry['mtime_ns']):
+            return None
+        if not all((self.root / output['path']).exists() for output in entry['outputs']):
+            return None
+        return entry
+
+    def restore(self, entry):
+        """Count entry as resumed and return its outputs in the form record() takes."""
+        with self._lock:
+            self.resumed_fonts += 1
+            self.resumed_variants += entry['extracted']
+        return [(self.root / output['path'], self.root / output['source'],
+                 FontClass(output['kind'], output['count']) if output['kind'] else None,
+                 output['extracted'])
+                for output in entry['outputs']]
+
+    def record(self, source_path, extracted, outputs):
+        """Mark source_path as done.
+
+        outputs is [(path, source path, FontClass or None, extracted)] of
+        every file extracted from it, nested outputs included.
+        """
+        stat = os.stat(source_path)
+        entry = {
+            'source': self._relative(source_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'extracted': extracted,
+            'outputs': [{
+                'path': self._relative(path),
+                'source': self._relative(source),
+                'kind': font_class.kind if font_class else None,
+                'count': font_class.count if font_class else 0,
+                'extracted': output_extracted,
+            } for path, source, font_class, output_extracted in outputs],
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._done[entry['source']] = entry
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,155 @@
+"""WOFF2 and Unicode-range subset exports of extracted fonts.
+
+Exports are made from the extracted font's bytes while they are still in
+memory, in the same worker that extracted it, and are written to a 'web'
+folder next to the font. Results are cached by the font's content digest
+plus the export spec, so a font that was exported before is never subset
+or compressed again.
+"""
+import hashlib
+import io
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from font_common.atomic import atomic_write
+from font_common.font_index import cache_folder
+from font_common.sfnt import content_digest, read_table_directory
+
+# Folder (inside each output folder) that receives the exports
+WEB_FOLDER = "web"
+
+# Set FONT_EXPORT_CACHE to move the export cache, or to an empty string to disable it
+CACHE_PATH_ENV = 'FONT_EXPORT_CACHE'
+
+# Part of every cache key; bump it when the subsetting options below change
+CACHE_VERSION = 1
+
+class ExportSpec:
+    """What to export for every extracted font.
+
+    woff2   - write WOFF2 instead of TrueType/OpenType
+    subsets - [(name, codepoints)]; without subsets the whole font is exported
+    """
+    __slots__ = ('woff2', 'subsets')
+
+    def __init__(self, woff2=False, subsets=()):
+        self.woff2 = woff2
+        self.subsets = [(name, frozenset(codepoints)) for name, codepoints in subsets]
+
+    def targets(self):
+        """Return [(file name suffix, codepoints or None)] of the files to write per font."""
+        if not self.subsets:
+            return [("", None)]
+        return [(f".{name}", codepoints) for name, codepoints in self.subsets]
+
+    def extension(self, font_data):
+        if self.woff2:
+            return ".woff2"
+        return ".otf" if font_data[:4] == b'OTTO' else ".ttf"
+
+    def cache_key(self, digest, codepoints):
+        key = hashlib.sha256(f"{CACHE_VERSION}:{digest}:{self.woff2}:".encode('ascii'))
+        if codepoints is not None:
+            key.update(",".join(map(str, sorted(codepoints))).encode('ascii'))
+        return key.hexdigest()
+
+def parse_subset(text):
+    """Parse a --subset value: NAME=RANGES, e.g. latin=U+0000-00FF,U+0131."""
+    from fontTools.subset import parse_unicodes
+
+    name, sep, ranges = text.partition('=')
+    name = name.strip()
+    if not sep or not name or not ranges.strip():
+        raise ValueError(f"Expected NAME=RANGES, got {text!r}")
+    if not name.replace('-', '').replace('_', '').isalnum():
+        raise ValueError(f"Subset name {name!r} can only contain letters, digits, - and _")
+    try:
+        return name, parse_unicodes(ranges)
+    except ValueError:
+        raise ValueError(f"Invalid Unicode ranges in {text!r}") from None
+
+def default_cache_dir():
+    """Return the export cache folder, or None when disabled through FONT_EXPORT_CACHE."""
+    configured = os.environ.get(CACHE_PATH_ENV)
+    if configured is not None:
+        return Path(configured) if configured else None
+    return cache_folder() / 'web_export'
+
+def font_data_digest(font_data):
+    """content_digest of a standalone font held in memory."""
+    sfnt_version, directory = read_table_directory(io.BytesIO(font_data))
+    view = memoryview(font_data)
+    return content_digest(sfnt_version, {tag: view[offset:offset + length]
+                                         for tag, (offset, length) in directory.items()})
+
+def build_export(font_data, spec, codepoints):
+    """Return the exported bytes of one target, or None if the font has none of codepoints."""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(font_data))
+    try:
+        if codepoints is not None:
+            unicodes = codepoints.intersection(font.getBestCmap() or ())
+            if not unicodes:
+                return None
+            # Tables the subsetter doesn't know are dropped; that is expected here
+            logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
+            # Only glyph coverage changes; names and OpenType features are kept
+            options = subset.Options()
+            options.name_IDs = ['*']
+            options.name_languages = ['*']
+            options.layout_features = ['*']
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=unicodes)
+            subsetter.subset(font)
+        if spec.woff2:
+            font.flavor = 'woff2'
+        output = io.BytesIO()
+        font.save(output)
+        return output.getvalue()
+    finally:
+        font.close()
+
+def export_font(font_data, output_file, spec, cache_dir=None):
+    """Write the exports of one extracted font, given its bytes.
+
+    Returns (files written, of which from the cache).
+    """
+    web_dir = Path(output_file).parent / WEB_FOLDER
+    digest = font_data_digest(font_data)
+    extension = spec.extension(font_data)
+    written = cached = 0
+
+    for suffix, codepoints in spec.targets():
+        target = web_dir / f"{Path(output_file).stem}{suffix}{extension}"
+        cache_file = None
+        if cache_dir is not None:
+            key = spec.cache_key(digest, codepoints)
+            cache_file = Path(cache_dir) / key[:2] / f"{key}{extension}"
+
+        if cache_file is not None and cache_file.exists():
+            web_dir.mkdir(exist_ok=True)
+            with open(cache_file, 'rb') as src, atomic_write(target) as dst:
+                shutil.copyfileobj(src, dst)
+            written += 1
+            cached += 1
+            continue
+
+        data = build_export(font_data, spec, codepoints)
+        if data is None:
+            continue
+        web_dir.mkdir(exist_ok=True)
+        with atomic_write(target) as f:
+            f.write(data)
+        written += 1
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(cache_file) as f:
+                f.write(data)
+
+    return written, cached
@@ -1,11 +1,23 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from pathlib import Path
-from fontTools.ttLib import TTFont, TTCollection
 import traceback
 import os
+import queue
+from bisect import bisect_left
 import sys
+import threading
 import ctypes
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared helpers live in !python-font-tools/font_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from font_common import instrument
+from font_common.font_index import FontIndex, record_name
+from font_common.sfnt import (patch_collection_names, patch_name_table,
+                              read_collection_name_tables, read_name_table)
+from name_batch import (DERIVED_RULES, NAME_FIELDS, apply_font, check_rules,
+                        format_diff, plan_font)
 
 # Windows OLE drag and drop support
 if sys.platform == 'win32':
@@ -26,6 +38,146 @@ except ImportError:
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
+# Background font loading
+LOAD_WORKERS = min(4, os.cpu_count() or 1)
+LOAD_POLL_MS = 50
+LOAD_ITEMS_PER_POLL = 50  # list rows added per poll, keeps the UI responsive
+MAX_REPORTED_NAMES = 10
+
+# Font list rows: only the visible rows exist as widgets
+ROW_HEIGHT = 32
+WHEEL_ROWS = 3
+
+def prewarm():
+    """Import what reading the first font needs, on a loader thread while the window is idle"""
+    with instrument.stage('prewarm'):
+        from fontTools.ttLib import newTable
+        newTable('name')
+
+class LoadBatch:
+    """Bookkeeping for fonts being loaded in the background"""
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.futures = []
+        self.paths = set()
+        self.total = 0
+        self.finished = 0
+        self.results = {}  # sequence number -> (font_infos, error), waiting to be listed
+        self.next_seq = 0
+        self.loaded = 0
+        self.errors = []
+        self.duplicates = []
+
+def summarize_names(names):
+    """Format a list of names for a message box, truncating long lists"""
+    lines = [f"  • {name}" for name in names[:MAX_REPORTED_NAMES]]
+    if len(names) > MAX_REPORTED_NAMES:
+        lines.append(f"  … and {len(names) - MAX_REPORTED_NAMES} more")
+    return "\n".join(lines)
+
+class BatchEditDialog(ctk.CTkToplevel):
+    """Rule form for editing the names of all listed fonts at once"""
+    LABELS = {
+        'family': "Family Name:",
+        'subfamily': "Style:",
+        'full_name': "Full Name:",
+        'version': "Version:",
+        'postscript': "PostScript:",
+    }
+    
+    def __init__(self, editor, font_paths):
+        super().__init__(editor)
+        self.editor = editor
+        self.font_paths = font_paths
+        self.planned_rules = None
+        
+        self.title("Batch Edit")
+        self.geometry("560x460")
+        self.configure(fg_color="#242424")
+        self.transient(editor)
+        
+        ctk.CTkLabel(self, text=f"Rules for {len(font_paths)} font(s) - leave empty to keep, "
+                                "use {family}, {subfamily}, {stem}...",
+                     text_color="#888888").pack(fill="x", padx=15, pady=(15, 5))
+        
+        form_frame = ctk.CTkFrame(self, fg_color="#2b2b2b")
+        form_frame.pack(fill="x", padx=15, pady=5)
+        form_frame.grid_columnconfigure(1, weight=1)
+        self.entries = {}
+        for row, (field, _) in enumerate(NAME_FIELDS):
+            ctk.CTkLabel(form_frame, text=self.LABELS[field], text_color="#e0e0e0").grid(
+                row=row, column=0, padx=(10, 5), pady=4, sticky="w")
+            entry = ctk.CTkEntry(form_frame, placeholder_text=DERIVED_RULES.get(field, ""),
+                                 fg_color="#1a1a1a", border_color="#3d3d3d")
+            entry.grid(row=row, column=1, padx=(0, 10), pady=4, sticky="ew")
+            self.entries[field] = entry
+        
+        self.derive_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(self, text="Derive full and PostScript names from family and style",
+                        variable=self.derive_var).pack(fill="x", padx=15, pady=5)
+        
+        self.diff_box = ctk.CTkTextbox(self, height=150, fg_color="#1a1a1a")
+        self.diff_box.pack(fill="both", expand=True, padx=15, pady=5)
+        
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=15, pady=(5, 15))
+        self.preview_btn = ctk.CTkButton(btn_frame, text="Preview", width=80, command=self.preview,
+                                         fg_color="#2b2b2b", border_width=1, border_color="#3d3d3d",
+                                         hover_color="#3d3d3d", text_color="#e0e0e0")
+        self.preview_btn.pack(side="right", padx=5)
+        self.apply_btn = ctk.CTkButton(btn_frame, text="💾 Apply", width=80, command=self.apply,
+                                       state="disabled", fg_color="#0d7a0d", hover_color="#0a5e0a")
+        self.apply_btn.pack(side="right", padx=5)
+    
+    def get_rules(self):
+        rules = dict(DERIVED_RULES) if self.derive_var.get() else {}
+        for field, entry in self.entries.items():
+            if entry.get().strip():
+                rules[field] = entry.get().strip()
+        return rules
+    
+    def show_text(self, text):
+        self.diff_box.delete("1.0", "end")
+        self.diff_box.insert("1.0", text)
+    
+    def preview(self):
+        """Dry run: show what the rules would change"""
+        rules = self.get_rules()
+        try:
+            check_rules(rules)
+        except ValueError as e:
+            self.show_text(str(e))
+            return
+        self.planned_rules = None
+        self.apply_btn.configure(state="disabled")
+        self.preview_btn.configure(state="disabled")
+        self.show_text(f"Checking {len(self.font_paths)} font(s)...")
+        self.editor.run_name_batch(self.font_paths, rules, plan_font,
+                                   lambda results: self.show_preview(rules, results))
+    
+    def show_preview(self, rules, results):
+        if not self.winfo_exists():
+            return
+        self.preview_btn.configure(state="normal")
+        changed = sum(1 for r in results if r.changes and not r.error)
+        self.show_text(f"{changed} font(s) will change\n\n{format_diff(results)}")
+        if changed:
+            self.planned_rules = rules
+            self.apply_btn.configure(state="normal")
+    
+    def apply(self):
+        """Write the previewed rules; the form can't change them in between"""
+        if self.planned_rules is None or self.get_rules() != self.planned_rules:
+            self.show_text("Rules changed since the preview - press Preview again.")
+            self.apply_btn.configure(state="disabled")
+            return
+        self.apply_btn.configure(state="disabled")
+        self.preview_btn.configure(state="disabled")
+        self.show_text("Saving...")
+        self.editor.run_name_batch(self.font_paths, self.planned_rules, apply_font,
+                                   self.editor.finish_name_batch)
+        self.destroy()
+
 # Create base class depending on DnD availability
 if HAS_DND:
     class BaseWindow(TkinterDnD.Tk):
@@ -74,14 +226,58 @@ class CompactFontEditor(BaseWindow):
         self.current_font_index = None
         self.current_font_data = {}
         
+        # Font list view: indices into font_files that pass the filter,
+        # and the first of them shown in the top row
+        self.visible_indices = []
+        self.list_offset = 0
+        self.filter_text = ""
+        self.render_pending = False
+        
         # Pin/Unpin state
         self.is_pinned = False
         
+        # Persistent font metadata index shared with the other font tools
+        self.font_index = FontIndex.open_default()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Fonts are parsed on worker threads and handed back through a queue
+        self.load_executor = ThreadPoolExecutor(max_workers=LOAD_WORKERS)
+        self.load_queue = queue.Queue()
+        self.load_batch = None
+        # Files added while a cancelled batch winds down; they start the next batch
+        self.queued_paths = []
+        
         self.setup_compact_ui()
         
         # Bind keyboard navigation
         self.bind('<Up>', self.navigate_up)
         self.bind('<Down>', self.navigate_down)
+        
+        # fontTools is only imported once the window is up, so the first
+        # dropped font doesn't have to wait for it
+        self.load_executor.submit(prewarm)
+        self.after_idle(instrument.record_startup)
+    
+    def on_close(self):
+        """Stop background loading and flush the font index before closing the window"""
+        if self.load_batch is not None:
+            self.load_batch.cancel_event.set()
+        self.load_executor.shutdown(wait=True, cancel_futures=True)
+        if self.font_index is not None:
+            self.font_index.close()
+            self.font_index = None
+        instrument.close()
+        self.destroy()
+    
+    def lookup_font_record(self, font_path):
+        """Return indexed metadata for a font, or None to read it with fontTools"""
+        if self.font_index is None:
+            return None
+        try:
+            return self.font_index.get(font_path)
+        except Exception as e:
+            print(f"Font index lookup failed for {font_path}: {e}")
+            return None
     
     def set_application_icon(self):
         """Set the window and taskbar icon"""
@@ -258,9 +454,46 @@ class CompactFontEditor(BaseWindow):
         # Setup drag and drop
         self.setup_drag_drop()
         
-        # Font list
-        self.font_list_frame = ctk.CTkScrollableFrame(parent, height=280, fg_color="#1a1a1a")
+        # Background loading progress (shown only while a batch is loading)
+        self.load_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.load_frame.grid_columnconfigure(0, weight=1)
+        
+        self.load_label = ctk.CTkLabel(self.load_frame, text="", text_color="#888888",
+                                       font=ctk.CTkFont(size=11))
+        self.load_label.grid(row=0, column=0, sticky="w")
+        
+        self.load_cancel_btn = ctk.CTkButton(self.load_frame, text="Cancel", width=55, height=20,
+                                             command=self.cancel_loading,
+                                             fg_color="#8b0000", hover_color="#660000")
+        self.load_cancel_btn.grid(row=0, column=1, sticky="e")
+        
+        self.load_progress = ctk.CTkProgressBar(self.load_frame, height=8)
+        self.load_progress.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(2, 0))
+        self.load_progress.set(0)
+        
+        # Type-to-filter by family or file name
+        self.filter_entry = ctk.CTkEntry(parent, placeholder_text="Filter by family or filename",
+                                         height=24, fg_color="#1a1a1a", border_color="#3d3d3d")
+        self.filter_entry.pack(fill="x", padx=10, pady=(5, 0))
+        self.filter_entry.bind("<KeyRelease>", self.on_filter_changed)
+        
+        # Font list - a fixed pool of row buttons drawn from self.font_files
+        self.font_list_frame = ctk.CTkFrame(parent, height=280, fg_color="#1a1a1a")
         self.font_list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.font_list_frame.grid_columnconfigure(0, weight=1)
+        self.font_list_frame.grid_rowconfigure(0, weight=1)
+        
+        self.rows_frame = ctk.CTkFrame(self.font_list_frame, fg_color="transparent")
+        self.rows_frame.grid(row=0, column=0, sticky="nsew", padx=2, pady=2)
+        
+        self.list_scrollbar = ctk.CTkScrollbar(self.font_list_frame, command=self.on_list_scroll)
+        self.list_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        self.row_buttons = []
+        self.row_states = []
+        self.visible_row_count = 0
+        self.rows_frame.bind("<Configure>", self.on_list_resize)
+        self.bind_mouse_wheel(self.rows_frame)
         
     def setup_drag_drop(self):
         # Visual feedback on hover
@@ -297,11 +530,7 @@ class CompactFontEditor(BaseWindow):
         # Get dropped files - tkinterdnd2 returns them as a string
         files = self.parse_drop_files(event.data)
         
-        for file_path in files:
-            if os.path.exists(file_path) and os.path.isfile(file_path):
-                self.load_font(file_path)
-        
-        self.update_font_count()
+        self.load_fonts([f for f in files if os.path.exists(f) and os.path.isfile(f)])
         return event.action
     
     def parse_drop_files(self, data):
@@ -381,6 +610,13 @@ class CompactFontEditor(BaseWindow):
         btn_frame = ctk.CTkFrame(parent, fg_color="transparent")
         btn_frame.grid(row=2, column=0, padx=15, pady=15, sticky="e")
         
+        self.batch_btn = ctk.CTkButton(btn_frame, text="⚙ Batch Edit", width=100,
+                                      command=self.open_batch_edit,
+                                      fg_color="#2b2b2b", border_width=1, border_color="#3d3d3d",
+                                      hover_color="#3d3d3d",
+                                      text_color="#e0e0e0")
+        self.batch_btn.pack(side="left", padx=5)
+        
         self.revert_btn = ctk.CTkButton(btn_frame, text="↶ Revert", width=80, 
                                        command=self.revert_changes, state="disabled",
                                        fg_color="#2b2b2b", border_width=1, border_color="#3d3d3d",
@@ -406,73 +642,276 @@ class CompactFontEditor(BaseWindow):
             if not file_paths:
                 return
                 
-            for file_path in file_paths:
-                self.load_font(file_path)
-            self.update_font_count()
+            self.load_fonts(file_paths)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open file dialog:\n{str(e)}")
-        
-    def load_font(self, file_path):
-        try:
-            font_path = Path(file_path)
-            
-            if not font_path.exists():
-                messagebox.showerror("Error", f"File not found: {font_path.name}")
-                return
-            
-            if any(f['path'] == font_path for f in self.font_files):
-                messagebox.showinfo("Already Loaded", f"{font_path.name} is already in the list.")
-                return
-            
-            # Load font info
-            if font_path.suffix.lower() == '.ttc':
-                ttc = TTCollection(str(font_path))
-                font_info = {
-                    'path': font_path,
-                    'type': 'collection',
-                    'count': len(ttc.fonts),
-                    'name': font_path.stem
-                }
-                ttc.close()
+    
+    def read_font_info(self, font_path):
+        """Read the list entries for one font file (one per collection member).
+        Runs on a loader thread, so no UI calls here"""
+        if not font_path.exists():
+            raise FileNotFoundError("File not found")
+        
+        # Load font info, from the metadata index when possible
+        record = self.lookup_font_record(font_path)
+        if font_path.suffix.lower() == '.ttc':
+            if record is not None:
+                families = [record_name(record, 1, i) for i in range(record['member_count'])]
             else:
-                font = TTFont(str(font_path))
-                name_table = font['name']
-                family_name = name_table.getDebugName(1) or font_path.stem
-                font_info = {
-                    'path': font_path,
-                    'type': 'single',
-                    'name': family_name
-                }
-                font.close()
-            
-            self.font_files.append(font_info)
-            self.add_font_to_list(font_info, len(self.font_files) - 1)
-            print(f"Successfully loaded: {font_path.name}")
-            
-        except Exception as e:
-            error_details = traceback.format_exc()
-            messagebox.showerror("Error", f"Failed to load {os.path.basename(file_path)}:\n{str(e)}")
-            print(f"Error loading font:\n{error_details}")
+                families = [name_table.getDebugName(1) if name_table else None
+                            for name_table in read_collection_name_tables(font_path)]
+            return [{
+                'path': font_path,
+                'type': 'member',
+                'member': i,
+                'count': len(families),
+                'name': family or font_path.stem
+            } for i, family in enumerate(families)]
+        
+        if record is not None:
+            family_name = record_name(record, 1) or font_path.stem
+        else:
+            family_name = read_name_table(font_path).getDebugName(1) or font_path.stem
+        return [{
+            'path': font_path,
+            'type': 'single',
+            'name': family_name
+        }]
+    
+    def load_font_worker(self, batch, seq, font_path):
+        """Loader thread entry point: read one font and queue the result"""
+        font_infos = error = None
+        if not batch.cancel_event.is_set():
+            try:
+                font_infos = self.read_font_info(font_path)
+            except Exception as e:
+                error = f"{font_path.name}: {e}"
+                print(f"Error loading font:\n{traceback.format_exc()}")
+        self.load_queue.put((batch, seq, font_infos, error))
+    
+    def load_fonts(self, file_paths):
+        """Load fonts in the background; they are added to the list in the given order"""
+        if self.load_batch is not None and self.load_batch.cancel_event.is_set():
+            # A cancelled batch drops whatever is added to it
+            self.queued_paths.extend(file_paths)
+            return
+        if self.load_batch is None:
+            self.load_batch = LoadBatch()
+            self.load_frame.pack(fill="x", padx=10, pady=(0, 5), before=self.filter_entry)
+            self.load_cancel_btn.configure(state="normal")
+            self.after(LOAD_POLL_MS, self.poll_loaded_fonts)
+        batch = self.load_batch
+        
+        loaded_paths = {f['path'] for f in self.font_files}
+        for file_path in file_paths:
+            font_path = Path(file_path)
+            if font_path in loaded_paths or font_path in batch.paths:
+                batch.duplicates.append(font_path.name)
+                continue
+            batch.paths.add(font_path)
+            batch.futures.append(self.load_executor.submit(
+                self.load_font_worker, batch, batch.total, font_path))
+            batch.total += 1
+        
+        self.update_load_progress()
+    
+    def poll_loaded_fonts(self):
+        """Move finished results from the loader threads into the list (main thread)"""
+        batch = self.load_batch
+        while True:
+            try:
+                result_batch, seq, font_infos, error = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if result_batch is batch:
+                batch.finished += 1
+                batch.results[seq] = (font_infos, error)
+        
+        finished = all(f.done() for f in batch.futures) and self.load_queue.empty()
+        self.list_loaded_fonts(batch, finished)
+        
+        if finished and not batch.results:
+            self.finish_loading(batch)
+        else:
+            self.update_load_progress()
+            self.after(LOAD_POLL_MS, self.poll_loaded_fonts)
+    
+    def list_loaded_fonts(self, batch, finished):
+        """Add finished fonts to the list in submission order"""
+        for _ in range(LOAD_ITEMS_PER_POLL):
+            if batch.next_seq not in batch.results:
+                # Cancelled files never report back; skip their gaps at the end
+                if not (finished and batch.results):
+                    break
+                batch.next_seq = min(batch.results)
+            font_infos, error = batch.results.pop(batch.next_seq)
+            batch.next_seq += 1
+            if error:
+                batch.errors.append(error)
+            elif font_infos is not None:
+                for font_info in font_infos:
+                    self.font_files.append(font_info)
+                    self.add_font_to_list(font_info, len(self.font_files) - 1)
+                batch.loaded += 1
+        self.update_font_count()
+    
+    def update_load_progress(self):
+        batch = self.load_batch
+        if batch is None:
+            return
+        if batch.cancel_event.is_set():
+            self.load_label.configure(text="Cancelling...")
+        else:
+            self.load_label.configure(text=f"Loading {batch.finished}/{batch.total}")
+        self.load_progress.set(batch.finished / batch.total if batch.total else 1)
+    
+    def cancel_loading(self):
+        """Stop loading the rest of the current batch"""
+        batch = self.load_batch
+        if batch is None:
+            return
+        batch.cancel_event.set()
+        for future in batch.futures:
+            future.cancel()
+        self.load_cancel_btn.configure(state="disabled")
+        self.update_load_progress()
+    
+    def finish_loading(self, batch):
+        """Hide the progress bar and report problems of the batch in one dialog"""
+        self.load_batch = None
+        self.load_frame.pack_forget()
+        print(f"Loaded {batch.loaded} font(s)")
+        if self.queued_paths:
+            self.after_idle(self.load_fonts, self.queued_paths)
+            self.queued_paths = []
+        
+        if not batch.errors and not batch.duplicates:
+            return
+        message = [f"Loaded {batch.loaded} of {batch.total + len(batch.duplicates)} font(s)."]
+        if batch.cancel_event.is_set():
+            message.append("Loading was cancelled.")
+        if batch.duplicates:
+            message.append(f"\nAlready in the list ({len(batch.duplicates)}):\n"
+                           f"{summarize_names(batch.duplicates)}")
+        if batch.errors:
+            message.append(f"\nFailed to load ({len(batch.errors)}):\n"
+                           f"{summarize_names(batch.errors)}")
+        show = messagebox.showwarning if batch.errors else messagebox.showinfo
+        show("Load Report", "\n".join(message))
             
     def add_font_to_list(self, font_info, index):
-        item_frame = ctk.CTkFrame(self.font_list_frame, height=32, fg_color="transparent")
-        item_frame.pack(fill="x", padx=2, pady=1)
-        item_frame.grid_propagate(False)
-        
         display_name = font_info['path'].name
-        if font_info['type'] == 'collection':
-            display_name += f" ({font_info['count']} fonts)"
+        if font_info['type'] == 'member':
+            display_name += f" [{font_info['member'] + 1}/{font_info['count']}]"
+        
+        # Only text is stored per font; rows are drawn by render_font_list
+        font_info['display'] = display_name
+        font_info['search'] = f"{font_info['name']}\n{font_info['path'].name}".lower()
+        
+        if self.font_matches_filter(font_info):
+            self.visible_indices.append(index)
+        self.schedule_render()
+    
+    def font_matches_filter(self, font_info):
+        return not self.filter_text or self.filter_text in font_info['search']
+    
+    def refilter_fonts(self):
+        """Recompute which fonts pass the filter"""
+        self.visible_indices = [i for i, font_info in enumerate(self.font_files)
+                                if self.font_matches_filter(font_info)]
+        self.schedule_render()
+    
+    def on_filter_changed(self, event=None):
+        text = self.filter_entry.get().strip().lower()
+        if text != self.filter_text:
+            self.filter_text = text
+            self.list_offset = 0
+            self.refilter_fonts()
+    
+    def bind_mouse_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_mouse_wheel)
+        widget.bind("<Button-4>", self.on_mouse_wheel)
+        widget.bind("<Button-5>", self.on_mouse_wheel)
+    
+    def on_mouse_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or (event.delta and event.delta > 0):
+            self.list_offset -= WHEEL_ROWS
+        else:
+            self.list_offset += WHEEL_ROWS
+        self.render_font_list()
+        return "break"
+    
+    def on_list_scroll(self, *args):
+        """Scrollbar callback: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.list_offset = int(float(args[1]) * len(self.visible_indices))
+        elif args[0] == 'scroll':
+            rows = self.visible_row_count if args[2] == 'pages' else 1
+            self.list_offset += int(args[1]) * rows
+        self.render_font_list()
+    
+    def on_list_resize(self, event):
+        """Create just enough row buttons to fill the list area"""
+        self.visible_row_count = max(1, event.height // ROW_HEIGHT)
+        while len(self.row_buttons) < self.visible_row_count:
+            slot = len(self.row_buttons)
+            btn = ctk.CTkButton(self.rows_frame, text="",
+                               command=lambda s=slot: self.on_row_click(s),
+                               anchor="w", height=ROW_HEIGHT - 4, 
+                               fg_color="#2b2b2b",
+                               hover_color="#3d3d3d",
+                               text_color="#e0e0e0")
+            self.bind_mouse_wheel(btn)
+            self.row_buttons.append(btn)
+            self.row_states.append(None)
+        self.render_font_list()
+    
+    def on_row_click(self, slot):
+        position = self.list_offset + slot
+        if position < len(self.visible_indices):
+            self.select_font(self.visible_indices[position])
+    
+    def schedule_render(self):
+        """Redraw the list once the current batch of changes is done"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render_font_list)
+    
+    def render_font_list(self):
+        """Draw the visible slice of the (filtered) font list into the row buttons"""
+        self.render_pending = False
+        total = len(self.visible_indices)
+        rows = self.visible_row_count
+        self.list_offset = max(0, min(self.list_offset, total - rows))
+        
+        for slot, btn in enumerate(self.row_buttons):
+            position = self.list_offset + slot
+            if slot >= rows or position >= total:
+                state = None
+            else:
+                index = self.visible_indices[position]
+                state = (self.font_files[index]['display'], index == self.current_font_index)
+            if state == self.row_states[slot]:
+                continue
+            self.row_states[slot] = state
             
-        btn = ctk.CTkButton(item_frame, text=display_name, 
-                           command=lambda idx=index: self.select_font(idx),
-                           anchor="w", height=28, 
-                           fg_color="#2b2b2b",
-                           hover_color="#3d3d3d",
-                           text_color="#e0e0e0")
-        btn.pack(fill="x", padx=2, pady=2)
+            if state is None:
+                btn.place_forget()
+                continue
+            display_name, selected = state
+            if selected:
+                # Highlight selected font with blue color
+                btn.configure(text=display_name, fg_color="#1f538d",
+                              hover_color="#14375e", text_color="#ffffff")
+            else:
+                btn.configure(text=display_name, fg_color="#2b2b2b",
+                              hover_color="#3d3d3d", text_color="#e0e0e0")
+            btn.place(x=0, y=slot * ROW_HEIGHT, relwidth=1.0)
         
-        # Store button reference for highlighting
-        font_info['button'] = btn
+        if total <= rows:
+            self.list_scrollbar.set(0, 1)
+        else:
+            self.list_scrollbar.set(self.list_offset / total, (self.list_offset + rows) / total)
         
     def select_font(self, index):
         if index >= len(self.font_files):
@@ -497,26 +936,28 @@ class CompactFontEditor(BaseWindow):
         self.update_font_highlights()
         
         try:
-            if font_info['type'] == 'collection':
-                messagebox.showinfo("Collection Font", 
-                    f"This font collection contains {font_info['count']} variants.\n"
-                    "Please select individual font files for editing.")
-                return
+            member = font_info.get('member', 0)
+            record = self.lookup_font_record(font_info['path'])
+            if record is not None:
+                self.current_font_data = {
+                    'family': record_name(record, 1, member) or "",
+                    'subfamily': record_name(record, 2, member) or "",
+                    'full_name': record_name(record, 4, member) or "",
+                    'postscript': record_name(record, 6, member) or "",
+                    'version': record_name(record, 5, member) or ""
+                }
+            else:
+                name_table = self.read_name_table(font_info)
                 
-            font = TTFont(str(font_info['path']))
-            name_table = font['name']
-            
-            self.current_font_data = {
-                'family': name_table.getDebugName(1) or "",
-                'subfamily': name_table.getDebugName(2) or "",
-                'full_name': name_table.getDebugName(4) or "",
-                'postscript': name_table.getDebugName(6) or "",
-                'version': name_table.getDebugName(5) or ""
-            }
-            
-            font.close()
+                self.current_font_data = {
+                    'family': name_table.getDebugName(1) or "",
+                    'subfamily': name_table.getDebugName(2) or "",
+                    'full_name': name_table.getDebugName(4) or "",
+                    'postscript': name_table.getDebugName(6) or "",
+                    'version': name_table.getDebugName(5) or ""
+                }
             
-            self.current_font_label.configure(text=font_info['path'].name)
+            self.current_font_label.configure(text=font_info['display'])
             self.family_name_entry.delete(0, 'end')
             self.family_name_entry.insert(0, self.current_font_data['family'])
             
@@ -573,8 +1014,8 @@ class CompactFontEditor(BaseWindow):
                 messagebox.showwarning("Warning", "Family name cannot be empty!")
                 return
                 
-            font = TTFont(str(font_path))
-            name_table = font['name']
+            # Only the name table is rebuilt; all other tables are copied raw
+            name_table = self.read_name_table(font_info)
             
             for record in name_table.names:
                 if record.nameID == 1:
@@ -588,10 +1029,15 @@ class CompactFontEditor(BaseWindow):
                 elif record.nameID == 5 and new_version:
                     record.string = new_version
                     
-            font.save(str(font_path))
-            font.close()
+            if font_info['type'] == 'member':
+                # Other members and shared tables are left as they are
+                patch_collection_names(font_path, {font_info['member']: name_table})
+            else:
+                patch_name_table(font_path, name_table)
+            if self.font_index is not None:
+                self.font_index.forget(font_path)
             
-            messagebox.showinfo("Success", f"✓ Font saved successfully!\n{font_path.name}")
+            messagebox.showinfo("Success", f"✓ Font saved successfully!\n{font_info['display']}")
             
             self.current_font_data = {
                 'family': new_family,
@@ -604,17 +1050,71 @@ class CompactFontEditor(BaseWindow):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to apply changes:\n{str(e)}")
             
+    def open_batch_edit(self):
+        """Open the batch rule form for the fonts shown in the (filtered) list"""
+        font_paths = [self.font_files[i]['path'] for i in self.visible_indices
+                      if self.font_files[i]['type'] == 'single']
+        if not font_paths:
+            messagebox.showinfo("Batch Edit", "No editable fonts in the list.")
+            return
+        if self.current_font_index is not None and self.has_unsaved_changes():
+            messagebox.showwarning("Batch Edit", "Save or revert the current font first.")
+            return
+        BatchEditDialog(self, font_paths)
+    
+    def run_name_batch(self, font_paths, rules, worker, callback):
+        """Run worker(path, rules) for every font on the loader threads, then callback(results)"""
+        futures = [self.load_executor.submit(worker, path, rules) for path in font_paths]
+        self.after(LOAD_POLL_MS, self.poll_name_batch, futures, callback)
+    
+    def poll_name_batch(self, futures, callback):
+        if all(f.done() for f in futures):
+            callback([f.result() for f in futures])
+        else:
+            self.after(LOAD_POLL_MS, self.poll_name_batch, futures, callback)
+    
+    def finish_name_batch(self, results):
+        """Refresh list entries of fonts written by a batch and report the outcome"""
+        changed = {r.path: r for r in results if r.changes and not r.error}
+        errors = [f"{r.path.name}: {r.error}" for r in results if r.error]
+        for font_info in self.font_files:
+            result = changed.get(font_info['path'])
+            if result is None:
+                continue
+            if self.font_index is not None:
+                self.font_index.forget(font_info['path'])
+            for change in result.changes:
+                if change.name_id == 1:
+                    font_info['name'] = change.new
+                    font_info['search'] = f"{change.new}\n{font_info['path'].name}".lower()
+        self.refilter_fonts()
+        
+        # Reload the form if the selected font was rewritten
+        if self.current_font_index is not None and self.font_files[self.current_font_index]['path'] in changed:
+            self.current_font_data = {}
+            self.select_font(self.current_font_index)
+        
+        message = f"✓ Changed {len(changed)} of {len(results)} font(s)."
+        if errors:
+            messagebox.showwarning("Batch Edit", f"{message}\n\nFailed ({len(errors)}):\n{summarize_names(errors)}")
+        else:
+            messagebox.showinfo("Batch Edit", message)
+    
+    def read_name_table(self, font_info):
+        """Decompile the name table of a listed font or collection member"""
+        if font_info['type'] == 'member':
+            name_table = read_collection_name_tables(font_info['path'])[font_info['member']]
+            if name_table is None:
+                raise ValueError("Collection member has no name table")
+            return name_table
+        return read_name_table(font_info['path'])
+    
     def remove_font(self):
         if self.current_font_index is not None:
             self.font_files.pop(self.current_font_index)
             
-            for widget in self.font_list_frame.winfo_children():
-                widget.destroy()
-                
-            for i, font_info in enumerate(self.font_files):
-                self.add_font_to_list(font_info, i)
-            
             self.current_font_index = None
+            self.refilter_fonts()
             self.current_font_label.configure(text="No font selected")
             self.clear_form()
             self.update_font_count()
@@ -642,12 +1142,11 @@ class CompactFontEditor(BaseWindow):
                               f"Are you sure you want to clear all {len(self.font_files)} font(s)?"):
             self.font_files.clear()
             
-            # Clear the list display
-            for widget in self.font_list_frame.winfo_children():
-                widget.destroy()
-            
-            # Reset current selection
+            # Reset current selection and the list display
             self.current_font_index = None
+            self.visible_indices = []
+            self.list_offset = 0
+            self.render_font_list()
             self.current_font_label.configure(text="No font selected")
             self.clear_form()
             self.update_font_count()
@@ -678,49 +1177,52 @@ class CompactFontEditor(BaseWindow):
         return current_values != self.current_font_data
     
     def update_font_highlights(self):
-        """Update visual highlights for selected font"""
-        for i, font_info in enumerate(self.font_files):
-            if 'button' in font_info:
-                if i == self.current_font_index:
-                    # Highlight selected font with blue color
-                    font_info['button'].configure(
-                        fg_color="#1f538d",
-                        hover_color="#14375e",
-                        text_color="#ffffff"
-                    )
-                else:
-                    # Normal state
-                    font_info['button'].configure(
-                        fg_color="#2b2b2b",
-                        hover_color="#3d3d3d",
-                        text_color="#e0e0e0"
-                    )
+        """Scroll the selected font into view and update highlights"""
+        if self.current_font_index is not None:
+            position = bisect_left(self.visible_indices, self.current_font_index)
+            if position < len(self.visible_indices) and self.visible_indices[position] == self.current_font_index:
+                if position < self.list_offset:
+                    self.list_offset = position
+                elif position >= self.list_offset + self.visible_row_count:
+                    self.list_offset = position - self.visible_row_count + 1
+        self.render_font_list()
+    
+    def visible_position(self):
+        """Position of the selected font among the filtered fonts, or None"""
+        if self.current_font_index is None:
+            return None
+        position = bisect_left(self.visible_indices, self.current_font_index)
+        if position < len(self.visible_indices) and self.visible_indices[position] == self.current_font_index:
+            return position
+        return None
     
     def navigate_up(self, event):
         """Navigate to previous font with Up arrow key"""
-        if not self.font_files:
+        if not self.visible_indices:
             return
         
-        if self.current_font_index is None:
+        position = self.visible_position()
+        if position is None:
             # If nothing selected, select the last font
-            self.select_font(len(self.font_files) - 1)
-        elif self.current_font_index > 0:
+            self.select_font(self.visible_indices[-1])
+        elif position > 0:
             # Move to previous font
-            self.select_font(self.current_font_index - 1)
+            self.select_font(self.visible_indices[position - 1])
         
         return "break"  # Prevent default behavior
     
     def navigate_down(self, event):
         """Navigate to next font with Down arrow key"""
-        if not self.font_files:
+        if not self.visible_indices:
             return
         
-        if self.current_font_index is None:
+        position = self.visible_position()
+        if position is None:
             # If nothing selected, select the first font
-            self.select_font(0)
-        elif self.current_font_index < len(self.font_files) - 1:
+            self.select_font(self.visible_indices[0])
+        elif position < len(self.visible_indices) - 1:
             # Move to next font
-            self.select_font(self.current_font_index + 1)
+            self.select_font(self.visible_indices[position + 1])
         
         return "break"  # Prevent default behavior
 
@@ -733,5 +1235,6 @@ if __name__ == "__main__":
         except:
             pass
     
+    instrument.configure_from_env("font_name_editor")
     app = CompactFontEditor()
     app.mainloop()
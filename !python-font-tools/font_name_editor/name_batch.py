@@ -0,0 +1,230 @@
+"""Batch name-table editing for the Font Name Editor.
+
+Rules are templates per name field, e.g. --family "Inter Display" and
+--full-name "{family} {subfamily}". Placeholders are the field names below
+plus {stem} (file name without extension); derived fields see the new values
+of the fields before them. Without --apply only a dry-run diff is printed.
+"""
+import argparse
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import freeze_support
+from pathlib import Path
+
+# Shared helpers live in !python-font-tools/font_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from font_common.sfnt import patch_name_table, read_name_table
+
+# Editable fields in the order they are evaluated, with their name IDs
+NAME_FIELDS = (
+    ('family', 1),
+    ('subfamily', 2),
+    ('full_name', 4),
+    ('version', 5),
+    ('postscript', 6),
+)
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.woff', '.woff2')
+
+# Rules applied by --derive: full and PostScript names from family + style
+DERIVED_RULES = {
+    'full_name': "{family} {subfamily}",
+    'postscript': "{family}-{subfamily}",
+}
+
+
+# One name record that a rule rewrites
+RecordChange = namedtuple('RecordChange',
+                          'name_id platform_id encoding_id language_id old new')
+
+
+class NameChange:
+    """Planned edit of one font: [RecordChange] plus an error, if any"""
+    __slots__ = ('path', 'changes', 'error')
+
+    def __init__(self, path, changes=(), error=None):
+        self.path = path
+        self.changes = list(changes)
+        self.error = error
+
+
+def read_name(name_table, name_id):
+    """Windows English text of a name ID, else whatever getDebugName finds"""
+    record = name_table.getName(name_id, 3, 1, 0x409)
+    if record is not None:
+        return record.toUnicode()
+    return name_table.getDebugName(name_id) or ""
+
+
+def read_names(name_table):
+    """Return {field: string} of the editable fields of a name table"""
+    return {field: read_name(name_table, name_id) for field, name_id in NAME_FIELDS}
+
+
+def render_names(names, rules, stem):
+    """Apply the rule templates to the current names and return the new names"""
+    values = dict(names, stem=stem)
+    for field, _ in NAME_FIELDS:
+        if field in rules:
+            try:
+                values[field] = rules[field].format(**values).strip()
+            except (KeyError, IndexError) as e:
+                raise ValueError(f"Unknown placeholder {e} in {field} rule") from None
+    # PostScript names can't contain spaces, same as in the editor form
+    if 'postscript' in rules:
+        values['postscript'] = values['postscript'].replace(" ", "")
+    return {field: values[field] for field, _ in NAME_FIELDS}
+
+
+def record_changes(name_table, new, rules):
+    """Return [RecordChange] of the records whose field has a rule and whose text changes.
+
+    A rule rewrites every record of its name ID (all platforms and
+    languages); fields without a rule are left alone.
+    """
+    changes = []
+    for field, name_id in NAME_FIELDS:
+        if field not in rules:
+            continue
+        for record in name_table.names:
+            if record.nameID != name_id:
+                continue
+            old = record.toUnicode()
+            if old != new[field]:
+                changes.append(RecordChange(name_id, record.platformID, record.platEncID,
+                                            record.langID, old, new[field]))
+    return changes
+
+
+def set_names(name_table, changes):
+    """Write the new text of every changed record"""
+    for change in changes:
+        name_table.setName(change.new, change.name_id, change.platform_id,
+                           change.encoding_id, change.language_id)
+
+
+def check_rules(rules):
+    """Raise ValueError if a rule template uses an unknown placeholder"""
+    render_names({field: "" for field, _ in NAME_FIELDS}, rules, "")
+
+
+def _plan_names(font_path, name_table, rules):
+    new = render_names(read_names(name_table), rules, font_path.stem)
+    if not new['family']:
+        return NameChange(font_path, error="Family name cannot be empty")
+    return NameChange(font_path, record_changes(name_table, new, rules))
+
+
+def plan_font(font_path, rules):
+    """Work out the name changes rules make to one font, without writing it"""
+    font_path = Path(font_path)
+    try:
+        return _plan_names(font_path, read_name_table(font_path), rules)
+    except Exception as e:
+        return NameChange(font_path, error=str(e))
+
+
+def apply_font(font_path, rules):
+    """Write the name changes rules make to one font; returns its NameChange"""
+    font_path = Path(font_path)
+    try:
+        name_table = read_name_table(font_path)
+        plan = _plan_names(font_path, name_table, rules)
+        if plan.changes and not plan.error:
+            # Only the name table is rebuilt, all other tables are copied raw
+            set_names(name_table, plan.changes)
+            patch_name_table(font_path, name_table)
+        return plan
+    except Exception as e:
+        return NameChange(font_path, error=str(e))
+
+
+def run_batch(font_paths, rules, apply=False, executor=None):
+    """Plan (or apply) rules for many fonts; returns NameChange results in input order"""
+    worker = apply_font if apply else plan_font
+    if executor is None:
+        return [worker(path, rules) for path in font_paths]
+    return list(executor.map(worker, font_paths, [rules] * len(font_paths), chunksize=16))
+
+
+def format_diff(results):
+    """Format planned changes as a readable diff"""
+    lines = []
+    for result in results:
+        if result.error:
+            lines.append(f"[ERROR] {result.path.name}: {result.error}")
+        elif result.changes:
+            lines.append(result.path.name)
+            for change in result.changes:
+                lines.append(f"  ID {change.name_id} ({change.platform_id}/{change.encoding_id}/"
+                             f"0x{change.language_id:X}): {change.old!r} -> {change.new!r}")
+    return "\n".join(lines)
+
+
+def collect_fonts(paths, recursive=False):
+    """Expand files and folders into a sorted list of editable font files"""
+    fonts = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            candidates = path.rglob('*') if recursive else path.iterdir()
+            fonts.update(p for p in candidates if p.suffix.lower() in FONT_EXTENSIONS)
+        elif path.suffix.lower() in FONT_EXTENSIONS:
+            fonts.add(path)
+    return sorted(fonts)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Apply templated name-table rules to many fonts (dry run unless --apply).")
+    parser.add_argument('paths', nargs='+', help="Font files or folders")
+    for field, name_id in NAME_FIELDS:
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field, metavar='TEMPLATE',
+                            help=f"New name ID {name_id}")
+    parser.add_argument('--derive', action='store_true',
+                        help="Derive full name and PostScript name from family and style")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Search folders recursively")
+    parser.add_argument('--apply', action='store_true', help="Write the changes (default: dry run)")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="Number of worker processes (0 = one per CPU, default: 0)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rules = dict(DERIVED_RULES) if args.derive else {}
+    rules.update({field: getattr(args, field) for field, _ in NAME_FIELDS
+                  if getattr(args, field) is not None})
+    if not rules:
+        print("ERROR: No rules given, nothing to change.")
+        return 2
+    try:
+        check_rules(rules)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 2
+
+    font_paths = collect_fonts(args.paths, args.recursive)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    print(f"[INFO] Fonts: {len(font_paths)}, workers: {jobs}, mode: {'apply' if args.apply else 'dry run'}")
+
+    if jobs > 1 and len(font_paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = run_batch(font_paths, rules, args.apply, executor)
+    else:
+        results = run_batch(font_paths, rules, args.apply)
+
+    diff = format_diff(results)
+    if diff:
+        print(diff)
+    changed = sum(1 for r in results if r.changes and not r.error)
+    errors = sum(1 for r in results if r.error)
+    verb = "Changed" if args.apply else "Would change"
+    print(f"[RESULT] {verb} {changed} font(s), {errors} error(s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
@@ -8,7 +8,7 @@ echo Building Font Name Editor
 echo ========================================
 echo.
 
-pyinstaller --onefile --windowed --name=Font_Name_Editor --icon=icon/font_name_editor.ico --add-data=icon;icon --clean Font_Name_Editor.pyw
+pyinstaller --onefile --windowed --name=Font_Name_Editor --icon=icon/font_name_editor.ico --add-data=icon;icon --paths=.. --clean Font_Name_Editor.pyw
 
 echo.
 echo %ESC%[92m========================================
@@ -0,0 +1,345 @@
+"""Disassemble, rename and assemble fonts in one pass, without intermediate files.
+
+Collections and variable fonts in the source folder are split in memory,
+named the way the assembler's rename step names them, grouped by family and
+written to the export folder as one .ttc per family. Split fonts are kept in
+memory up to --memory-cap and spilled to a temporary folder beyond that;
+spilled fonts are memory-mapped, not read back, when their family is written.
+"""
+import argparse
+import io
+import os
+import struct
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from multiprocessing import freeze_support
+from pathlib import Path
+
+# Reuse font_common and the stages of the disassembler and assembler
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TOOLS_DIR))
+sys.path.insert(0, str(TOOLS_DIR / "font_disassembler"))
+sys.path.insert(0, str(TOOLS_DIR / "one_family_fonts_assembler"))
+from font_common.font_access import mapped_tables
+from font_common.sfnt import (classify_stream, content_digest, decompile_name_table,
+                              read_collection, read_os2_style, read_table,
+                              read_table_directory, write_sfnt)
+from font_separator_multiple import load_variable_source
+from one_family_fonts_assembler import (FontInfo, create_font_collection, group_fonts_by_family,
+                                        sanitize_family_name, sanitize_style_name,
+                                        validate_font_group)
+
+SOURCE_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+DEFAULT_MEMORY_CAP_MB = 1024
+
+# Variable instances submitted ahead of the one being stored, per worker process
+INSTANCES_PER_WORKER = 2
+
+class FontStore:
+    """Split fonts keyed by their FontInfo, in memory up to memory_cap bytes.
+
+    Fonts that don't fit are written to spill_dir and read back on demand.
+    """
+    def __init__(self, memory_cap, spill_dir):
+        self.memory_cap = memory_cap
+        self.spill_dir = Path(spill_dir)
+        self.in_memory = 0
+        self.spilled = 0
+        self.spilled_bytes = 0
+        self._fonts = {}
+
+    def add(self, key, data):
+        if self.in_memory + len(data) <= self.memory_cap:
+            self._fonts[key] = data
+            self.in_memory += len(data)
+            return
+        spill_path = self.spill_dir / f"{self.spilled}.ttf"
+        spill_path.write_bytes(data)
+        self._fonts[key] = spill_path
+        self.spilled += 1
+        self.spilled_bytes += len(data)
+
+    def tables(self, key, mapped):
+        """Return (sfnt_version, {tag: memoryview}) of a font.
+
+        Spilled fonts are memory-mapped until the ExitStack mapped is closed.
+        """
+        data = self._fonts[key]
+        if isinstance(data, Path):
+            return mapped.enter_context(mapped_tables(data))
+        return sfnt_tables_from_bytes(data)
+
+    def release(self, key):
+        """Drop a font once it has been written into its collection."""
+        data = self._fonts.pop(key)
+        if isinstance(data, Path):
+            data.unlink()
+        else:
+            self.in_memory -= len(data)
+
+def sfnt_tables_from_bytes(data):
+    """Return (sfnt_version, {tag: memoryview}) of a standalone font held in memory."""
+    sfnt_version, directory = read_table_directory(io.BytesIO(data))
+    view = memoryview(data)
+    return sfnt_version, {tag: view[offset:offset + length]
+                          for tag, (offset, length) in directory.items()}
+
+def instantiate_to_bytes(source, location):
+    """Instantiate a variable font (a file path or its bytes) at location.
+
+    Returns (font bytes, None) or (None, error message). Runs in worker processes.
+    """
+    from fontTools.ttLib import TTFont
+    from fontTools.varLib import instancer
+    
+    try:
+        data = load_variable_source(source) if isinstance(source, Path) else source
+        var_font = TTFont(io.BytesIO(data))
+        try:
+            instancer.instantiateVariableFont(var_font, location, inplace=True)
+            output = io.BytesIO()
+            var_font.save(output)
+        finally:
+            var_font.close()
+        return output.getvalue(), None
+    except Exception as e:
+        return None, str(e)
+
+def collection_members(data):
+    """Yield (label, standalone font bytes) for each member of a TTC held in memory."""
+    f = io.BytesIO(data)
+    view = memoryview(data)
+    for i, (sfnt_version, directory) in enumerate(read_collection(f)):
+        name_table = decompile_name_table(f, directory)
+        family = (name_table.getDebugName(1) if name_table else None) or "Font"
+        subfamily = (name_table.getDebugName(2) if name_table else None) or f"Variant{i+1}"
+        output = io.BytesIO()
+        write_sfnt(output, sfnt_version, {tag: view[offset:offset + length]
+                                          for tag, (offset, length) in directory.items()})
+        yield f"{family}-{subfamily}", output.getvalue()
+
+def variable_instances(data):
+    """Return [(label, location)] for the named instances of a variable font."""
+    from fontTools.ttLib import TTFont
+    
+    font = TTFont(io.BytesIO(data), lazy=True)
+    try:
+        name_table = font['name'] if 'name' in font else None
+        family = (name_table.getDebugName(1) if name_table else None) or "Font"
+        fvar = font['fvar']
+        instances = []
+        for i, instance in enumerate(fvar.instances):
+            subfamily = name_table.getDebugName(instance.subfamilyNameID) if name_table else None
+            location = {axis.axisTag: instance.coordinates[axis.axisTag] for axis in fvar.axes}
+            instances.append((f"{family}-{subfamily or f'Instance{i+1}'}", location))
+        return instances
+    finally:
+        font.close()
+
+def bounded_results(pool, func, source, locations, window):
+    """Yield func(source, location) for each location, in order.
+
+    At most window tasks are submitted at a time, so the finished instance
+    bytes waiting in futures stay bounded however many instances there are.
+    """
+    pending = deque()
+    for location in locations:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(func, source, location))
+    while pending:
+        yield pending.popleft().result()
+
+def split_font(label, data, source, pool, level=1, window=1):
+    """Split font data into static fonts, recursing like the disassembler does.
+
+    source is the file path when data is a whole source file, so worker
+    processes can read it themselves instead of receiving the bytes.
+    window is the number of instances pool may work on ahead of the caller.
+    Yields (label, font bytes).
+    """
+    indent = "  " * level
+    font_class = classify_stream(io.BytesIO(data))
+
+    if font_class.is_collection:
+        print(f"{indent}[SPLIT] {label}: {font_class.count} collection member(s)")
+        for member_label, member_data in collection_members(data):
+            yield from split_font(member_label, member_data, None, pool, level + 1, window)
+        return
+
+    if font_class.is_variable and font_class.count > 0:
+        print(f"{indent}[SPLIT] {label}: {font_class.count} named instance(s)")
+        instances = variable_instances(data)
+        task_source = source if source is not None else data
+        locations = [location for _, location in instances]
+        if pool is None:
+            results = (instantiate_to_bytes(task_source, location) for location in locations)
+        else:
+            results = bounded_results(pool, instantiate_to_bytes, task_source, locations, window)
+        # Each instance is stored (or spilled) before more are submitted
+        for (instance_label, _), (instance_data, error) in zip(instances, results):
+            if error:
+                print(f"{indent}  [ERROR] Failed to instantiate {instance_label}: {error}")
+                continue
+            yield instance_label, instance_data
+        return
+
+    yield label, data
+
+def read_split_font_info(label, data):
+    """Read the assembler's FontInfo of a split font held in memory.
+
+    path is set to the name the assembler's rename step would give the file.
+    """
+    f = io.BytesIO(data)
+    _, directory = read_table_directory(f)
+    name_table = decompile_name_table(f, directory)
+    get_name = name_table.getDebugName if name_table else (lambda name_id: None)
+
+    # Same precedence as get_font_info in the assembler
+    family = get_name(1) or get_name(16)
+    subfamily = get_name(2) or 'Regular'
+    num_glyphs = 0
+    if 'maxp' in directory and directory['maxp'][1] >= 6:
+        num_glyphs = struct.unpack('>H', read_table(f, directory, 'maxp')[4:6])[0]
+    os2 = read_os2_style(f, directory) or {}
+
+    if family:
+        file_name = f"{sanitize_family_name(family)}-{sanitize_style_name(subfamily)}.ttf"
+    else:
+        file_name = f"{label}.ttf"
+    return FontInfo(
+        path=Path(file_name),
+        family=family,
+        subfamily=subfamily,
+        full_name=get_name(4) or family,
+        num_glyphs=num_glyphs,
+        typo_subfamily=get_name(17),
+        weight_class=os2.get('weight_class'),
+        fs_selection=os2.get('fs_selection')
+    )
+
+def split_sources(source_files, store, pool, window=1):
+    """Split every source file into the store. Returns the FontInfo of each split font."""
+    print(f"\n{'='*60}")
+    print(f"STEP 1: SPLITTING AND NAMING FONTS (IN MEMORY)")
+    print(f"{'='*60}\n")
+
+    font_infos = []
+    digests = {}
+    for source_file in source_files:
+        print(f"[PROCESS] {source_file.name}")
+        try:
+            data = source_file.read_bytes()
+            for label, font_data in split_font(source_file.stem, data, source_file, pool,
+                                               window=window):
+                info = read_split_font_info(label, font_data)
+                # Fonts identical to one already split are never stored or packed
+                digest = content_digest(*sfnt_tables_from_bytes(font_data))
+                if digest in digests:
+                    print(f"  ⚠ Skipping duplicate: {info.path.name} (identical to {digests[digest]})")
+                    continue
+                digests[digest] = info.path.name
+                store.add(info, font_data)
+                font_infos.append(info)
+                print(f"  ✓ {info.path.name}")
+        except Exception as e:
+            print(f"  ✗ ERROR: Failed to split {source_file.name}: {e}")
+
+    print(f"\n✓ Split into {len(font_infos)} font(s)")
+    if store.spilled:
+        print(f"  Spilled to disk: {store.spilled} font(s), {store.spilled_bytes / 1024:.2f} KB")
+    return font_infos
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Split collections and variable fonts and pack them into one .ttc per family, "
+                    "without writing intermediate files.")
+    parser.add_argument('source', nargs='?', default="1_source",
+                        help="Folder with the source fonts (default: 1_source)")
+    parser.add_argument('export', nargs='?', default="2_export",
+                        help="Folder for the collections (default: 2_export)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Worker processes for variable instances (0 = one per CPU, default: 1)")
+    parser.add_argument('--memory-cap', type=int, default=DEFAULT_MEMORY_CAP_MB, metavar='MB',
+                        help=f"Split fonts kept in memory before spilling to disk "
+                             f"(default: {DEFAULT_MEMORY_CAP_MB} MB)")
+    parser.add_argument('--spill-dir', default=None,
+                        help="Folder for spilled fonts (default: system temp folder)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    source_folder = Path(args.source).resolve()
+    export_folder = Path(args.export).resolve()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    print(f"\n{'='*60}")
+    print(f"FONT PIPELINE - SPLIT, RENAME AND ASSEMBLE")
+    print(f"{'='*60}")
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    if not source_folder.is_dir():
+        print(f"ERROR: Source folder '{source_folder}' does not exist!")
+        return 1
+    source_files = sorted(f for f in source_folder.iterdir()
+                          if f.is_file() and f.suffix.lower() in SOURCE_EXTENSIONS)
+    if not source_files:
+        print(f"ERROR: No font files found in '{source_folder}'!")
+        return 1
+    export_folder.mkdir(parents=True, exist_ok=True)
+
+    print(f"Source: {source_folder}")
+    print(f"Export: {export_folder}")
+    print(f"Worker processes: {jobs}")
+    print(f"Memory cap: {args.memory_cap} MB")
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        with tempfile.TemporaryDirectory(prefix="font_pipeline_", dir=args.spill_dir) as spill_dir:
+            store = FontStore(args.memory_cap * 1024 * 1024, spill_dir)
+            font_infos = split_sources(source_files, store, pool, INSTANCES_PER_WORKER * jobs)
+
+            family_groups = group_fonts_by_family(font_infos)
+
+            print(f"{'='*60}")
+            print(f"STEP 3: CREATING FONT COLLECTIONS")
+            print(f"{'='*60}")
+
+            saved_by_family = {}
+            failed = 0
+            for family_name, fonts in sorted(family_groups.items()):
+                validate_font_group(family_name, fonts)
+                # Spilled members must be unmapped before they can be deleted
+                with ExitStack() as mapped:
+                    saved_bytes = create_font_collection(
+                        family_name, fonts, export_folder / f"{family_name}.ttc",
+                        read_tables=lambda info: store.tables(info, mapped))
+                for info in fonts:
+                    store.release(info)
+                if saved_bytes is None:
+                    failed += 1
+                else:
+                    saved_by_family[family_name] = saved_bytes
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"\n{'='*60}")
+    print(f"✓ PROCESS COMPLETED")
+    print(f"{'='*60}")
+    print(f"Source files: {len(source_files)}")
+    print(f"Split fonts: {len(font_infos)}")
+    print(f"Families: {len(family_groups)} ({len(saved_by_family)} successful, {failed} failed)")
+    print(f"Bytes saved by shared tables: {sum(saved_by_family.values()) / 1024:.2f} KB")
+    print(f"Output location: {export_folder}")
+    print(f"{'='*60}\n")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
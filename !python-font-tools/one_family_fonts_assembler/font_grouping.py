@@ -0,0 +1,94 @@
+"""Columnar grouping of scanned fonts into families.
+
+The metadata of the whole corpus is laid out as one column per field
+(family, style and weight of every font side by side), and normalization,
+grouping and member ordering run as passes over whole columns: a single
+sort orders the corpus by family, weight, italic and style, after which
+every family is a contiguous run of rows in collection member order.
+"""
+from array import array
+from collections import Counter
+from itertools import groupby
+
+# usWeightClass assumed for fonts without an OS/2 table
+DEFAULT_WEIGHT = 400
+
+# fsSelection bits
+FS_ITALIC = 1 << 0
+FS_OBLIQUE = 1 << 9
+
+# str.translate table, built once for the whole corpus
+_STYLE_TABLE = str.maketrans('', '', ' -_')
+
+def sanitize_family_name(family_name):
+    """Remove spaces and invalid characters from family name."""
+    # Remove spaces
+    sanitized = family_name.replace(' ', '')
+    # Remove invalid filename characters
+    invalid_chars = '<>:"/\\|?*'
+    for char in invalid_chars:
+        sanitized = sanitized.replace(char, '')
+    return sanitized.strip()
+
+def normalize_families(names):
+    """Family keys of a column of family names, as sanitize_family_name makes them."""
+    return [sanitize_family_name(name) if name else "" for name in names]
+
+def normalize_styles(names):
+    """Style keys of a column of style names, so 'Semi Bold', 'semibold' and
+    'Semi-Bold' compare equal."""
+    return [name.translate(_STYLE_TABLE).casefold() if name else "regular" for name in names]
+
+class FontColumns:
+    """Grouping metadata of many FontInfo records, one list or array per field.
+
+    Family is FontInfo.family (name ID 1, else 16), so collection names
+    don't change. Style is the typographic subfamily (ID 17), else ID 2:
+    fonts with more than the four RIBBI styles often repeat 'Regular' or
+    'Italic' in ID 2 and only tell their weight apart in ID 17.
+    """
+    __slots__ = ('infos', 'family_keys', 'style_keys', 'weights', 'italics')
+
+    def __init__(self, infos):
+        self.infos = list(infos)
+        self.family_keys = normalize_families([info.family for info in self.infos])
+        self.style_keys = normalize_styles([info.typo_subfamily or info.subfamily
+                                            for info in self.infos])
+        self.weights = array('H', [info.weight_class or DEFAULT_WEIGHT for info in self.infos])
+        self.italics = array('B', [bool((info.fs_selection or 0) & (FS_ITALIC | FS_OBLIQUE))
+                                   for info in self.infos])
+
+    def __len__(self):
+        return len(self.infos)
+
+    def sort_order(self):
+        """Row indices ordered by family, then weight, italic, style and file name."""
+        family_keys, weights, italics = self.family_keys, self.weights, self.italics
+        style_keys, infos = self.style_keys, self.infos
+        return sorted(range(len(infos)),
+                      key=lambda row: (family_keys[row], weights[row], italics[row],
+                                       style_keys[row], infos[row].path.name))
+
+    def group(self):
+        """Return ({family key: [FontInfo] in weight order}, [rows without a family]).
+
+        The returned dict is sorted by family key.
+        """
+        order = self.sort_order()
+        missing = [row for row in order if not self.family_keys[row]]
+        groups = {}
+        for family_key, rows in groupby((row for row in order if self.family_keys[row]),
+                                        key=self.family_keys.__getitem__):
+            groups[family_key] = [self.infos[row] for row in rows]
+        return groups, missing
+
+def duplicate_styles(fonts):
+    """Sorted style names of the fonts of one family whose style key occurs more than once.
+
+    Names are reported as the fonts spell them, so 'Semi Bold' and 'SemiBold'
+    both show up.
+    """
+    names = [info.typo_subfamily or info.subfamily for info in fonts]
+    keys = normalize_styles(names)
+    counts = Counter(keys)
+    return sorted({name for name, key in zip(names, keys) if counts[key] > 1})
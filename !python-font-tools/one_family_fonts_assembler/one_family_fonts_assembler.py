@@ -1,64 +1,134 @@
+import argparse
+import io
+import json
 import os
 from pathlib import Path
-from fontTools.ttLib import TTFont, TTCollection
 import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack, redirect_stdout
 from datetime import datetime
-from collections import defaultdict
+from multiprocessing import freeze_support
+
+# Shared helpers live in !python-font-tools/font_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from font_common import instrument, watch
+from font_common.atomic import atomic_write
+from font_common.font_access import mapped_tables, open_font
+from font_common.font_index import FontIndex, file_sha256, record_name, record_os2
+from font_common.sfnt import font_digest, write_collection
+from font_grouping import FontColumns, duplicate_styles, normalize_families, sanitize_family_name
+
+# Input hashes of every family built, kept in 2_export for --incremental runs
+MANIFEST_NAME = ".assembler_manifest.json"
+
+# Peak memory of a family build, as a multiple of its source file sizes
+# (raw tables in memory plus the collection being written)
+MEMORY_FACTOR = 2
+DEFAULT_MEMORY_BUDGET_MB = 2048
 
 class FontAssemblerError(Exception):
     """Custom exception for font assembler errors."""
     pass
 
-def get_font_info(font_path):
-    """Extract detailed font information from a TTF file."""
+class FontInfo:
+    """Metadata of one source font, read once and carried through every step."""
+    __slots__ = ('path', 'family', 'subfamily', 'full_name', 'num_glyphs', 'sha256',
+                 'typo_subfamily', 'weight_class', 'fs_selection')
+    
+    def __init__(self, path, family, subfamily, full_name, num_glyphs, sha256=None,
+                 typo_subfamily=None, weight_class=None, fs_selection=None):
+        self.path = path
+        self.family = family
+        self.subfamily = subfamily
+        self.full_name = full_name
+        self.num_glyphs = num_glyphs
+        # Typographic subfamily (name ID 17) and OS/2 usWeightClass and
+        # fsSelection, used to tell styles apart and order family members
+        self.typo_subfamily = typo_subfamily
+        self.weight_class = weight_class
+        self.fs_selection = fs_selection
+        # Content hash, known up front when read through the font index
+        self.sha256 = sha256
+    
+    def content_hash(self):
+        """Return the SHA-256 of the font file, hashing it on first use."""
+        if self.sha256 is None:
+            self.sha256 = file_sha256(self.path)
+        return self.sha256
+
+def font_names(get_name):
+    """Return (family, subfamily, full name, typographic subfamily) from a
+    name ID -> string lookup.
+    
+    Both lookups used here (font_index records and name.getDebugName) take
+    the first English record of a name ID, so a font gets the same names
+    with and without the index.
+    """
+    family_name = get_name(1) or get_name(16)
+    return family_name, get_name(2) or 'Regular', get_name(4) or family_name, get_name(17)
+
+def get_font_info(font_path, font_index=None):
+    """Extract detailed font information from a TTF file.
+    
+    The persistent font index is consulted first. Otherwise only the 'name'
+    and 'maxp' tables are read; the rest of the file is never loaded.
+    """
     try:
-        font = TTFont(font_path)
-        name_table = font['name']
-        
-        family_name = None
-        subfamily_name = None
-        full_name = None
+        if font_index is not None:
+            record = font_index.get(font_path)
+            family_name, subfamily_name, full_name, typo_subfamily = font_names(
+                lambda name_id: record_name(record, name_id))
+            weight_class, fs_selection = record_os2(record)
+            return FontInfo(
+                path=font_path,
+                family=family_name,
+                subfamily=subfamily_name,
+                full_name=full_name,
+                num_glyphs=record['num_glyphs'],
+                sha256=record.get('sha256'),
+                typo_subfamily=typo_subfamily,
+                weight_class=weight_class,
+                fs_selection=fs_selection
+            )
         
-        # Extract names with priority for Windows platform
-        for record in name_table.names:
-            text = record.toUnicode()
+        with open_font(font_path, lazy=True) as font:
+            family_name, subfamily_name, full_name, typo_subfamily = font_names(
+                font['name'].getDebugName)
             
-            # Preferred Family (ID 16) - highest priority
-            if record.nameID == 16 and not family_name:
-                family_name = text
-            # Font Family (ID 1) - fallback
-            elif record.nameID == 1 and not family_name:
-                family_name = text
-            # Subfamily (ID 2) - style like Bold, Italic
-            elif record.nameID == 2 and not subfamily_name:
-                subfamily_name = text
-            # Full name (ID 4)
-            elif record.nameID == 4 and not full_name:
-                full_name = text
-        
-        # Get font metrics for validation
-        num_glyphs = font['maxp'].numGlyphs if 'maxp' in font else 0
-        
-        font.close()
-        
-        return {
-            'family': family_name,
-            'subfamily': subfamily_name or 'Regular',
-            'full_name': full_name or family_name,
-            'num_glyphs': num_glyphs
-        }
+            # Get font metrics for validation
+            num_glyphs = font['maxp'].numGlyphs if 'maxp' in font else 0
+            
+            # Weight/style bits for grouping
+            os2 = font['OS/2'] if 'OS/2' in font else None
+        
+        return FontInfo(
+            path=font_path,
+            family=family_name,
+            subfamily=subfamily_name,
+            full_name=full_name,
+            num_glyphs=num_glyphs,
+            typo_subfamily=typo_subfamily,
+            weight_class=os2.usWeightClass if os2 else None,
+            fs_selection=os2.fsSelection if os2 else None
+        )
     except Exception as e:
         raise FontAssemblerError(f"Error reading font '{font_path.name}': {e}")
 
-def sanitize_family_name(family_name):
-    """Remove spaces and invalid characters from family name."""
-    # Remove spaces
-    sanitized = family_name.replace(' ', '')
-    # Remove invalid filename characters
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        sanitized = sanitized.replace(char, '')
-    return sanitized.strip()
+def scan_fonts(ttf_files, font_index=None):
+    """Read metadata of every font file once. Unreadable files are reported and skipped."""
+    font_infos = []
+    for ttf_file in ttf_files:
+        try:
+            with instrument.stage('scan', path=str(ttf_file)):
+                info = get_font_info(ttf_file, font_index)
+            font_infos.append(info)
+            if instrument.enabled():
+                instrument.emit('file', stage='scan', path=str(ttf_file),
+                                bytes=ttf_file.stat().st_size, glyphs=info.num_glyphs)
+        except FontAssemblerError as e:
+            print(f"✗ ERROR: {e}")
+            instrument.emit('error', stage='scan', path=str(ttf_file), error=str(e))
+    return font_infos
 
 def sanitize_style_name(style_name):
     """Normalize style name."""
@@ -66,23 +136,23 @@ def sanitize_style_name(style_name):
     sanitized = style_name.replace(' ', '')
     return sanitized.strip()
 
-def rename_font_files(ttf_files):
-    """Rename all font files to <FontFamily>-<Weight>-<Style>.ttf pattern."""
+def rename_font_files(font_infos, font_index=None):
+    """Rename all font files to <FontFamily>-<Weight>-<Style>.ttf pattern.
+    
+    Each FontInfo's path is updated in place to the renamed file.
+    """
     print(f"\n{'='*60}")
     print(f"STEP 1: RENAMING FONT FILES")
     print(f"{'='*60}\n")
     
-    renamed_files = []
-    rename_map = {}
+    renamed_count = 0
     
-    for ttf_file in ttf_files:
+    for info in font_infos:
+        ttf_file = info.path
         try:
-            # Get font info
-            info = get_font_info(ttf_file)
-            
             # Sanitize names
-            family = sanitize_family_name(info['family'])
-            style = sanitize_style_name(info['subfamily'])
+            family = sanitize_family_name(info.family)
+            style = sanitize_style_name(info.subfamily)
             
             # Create new filename
             new_filename = f"{family}-{style}.ttf"
@@ -94,67 +164,58 @@ def rename_font_files(ttf_files):
                 if new_path.exists() and new_path != ttf_file:
                     print(f"⚠ WARNING: Target file already exists: {new_filename}")
                     print(f"  Skipping rename for: {ttf_file.name}")
-                    renamed_files.append(ttf_file)
-                    rename_map[ttf_file] = ttf_file
                 else:
                     # Rename the file
                     ttf_file.rename(new_path)
+                    if font_index is not None:
+                        font_index.move(ttf_file, new_path)
                     print(f"✓ Renamed: {ttf_file.name}")
                     print(f"       to: {new_filename}")
-                    renamed_files.append(new_path)
-                    rename_map[ttf_file] = new_path
+                    info.path = new_path
+                    renamed_count += 1
             else:
                 print(f"✓ Already correct: {ttf_file.name}")
-                renamed_files.append(ttf_file)
-                rename_map[ttf_file] = ttf_file
                 
         except Exception as e:
+            # Keep the original file name
             print(f"✗ ERROR renaming {ttf_file.name}: {e}")
-            # Keep original file in list
-            renamed_files.append(ttf_file)
-            rename_map[ttf_file] = ttf_file
     
-    print(f"\n✓ Renamed {len([k for k, v in rename_map.items() if k != v])} file(s)")
-    return renamed_files
+    print(f"\n✓ Renamed {renamed_count} file(s)")
+    return font_infos
 
-def group_fonts_by_family(ttf_files):
-    """Group font files by their font family."""
+def group_fonts_by_family(font_infos):
+    """Group font records by their font family.
+    
+    Members of each family are ordered by weight, then upright before
+    italic, which is the order they get in the collection.
+    """
     print(f"\n{'='*60}")
     print(f"STEP 2: GROUPING FONTS BY FAMILY")
     print(f"{'='*60}\n")
     
-    family_groups = defaultdict(list)
+    columns = FontColumns(font_infos)
+    family_groups, missing = columns.group()
     
-    for ttf_file in ttf_files:
-        try:
-            info = get_font_info(ttf_file)
-            info['path'] = ttf_file
-            
-            # Use sanitized family name as key
-            family_key = sanitize_family_name(info['family'])
-            family_groups[family_key].append(info)
-            
-        except Exception as e:
-            print(f"✗ ERROR reading {ttf_file.name}: {e}")
-            continue
+    for row in missing:
+        print(f"✗ ERROR reading {columns.infos[row].path.name}: no family name")
     
     # Display grouped fonts
     print(f"Found {len(family_groups)} font familie(s):\n")
     
-    for family_name, fonts in sorted(family_groups.items()):
+    for family_name, fonts in family_groups.items():
         print(f"📁 Family: {family_name} ({len(fonts)} variant(s))")
         for font_info in fonts:
-            print(f"   ├─ {font_info['path'].name}")
-            print(f"   │  Style: {font_info['subfamily']} | Glyphs: {font_info['num_glyphs']}")
+            print(f"   ├─ {font_info.path.name}")
+            print(f"   │  Style: {font_info.typo_subfamily or font_info.subfamily} | "
+                  f"Weight: {font_info.weight_class or '?'} | Glyphs: {font_info.num_glyphs}")
         print()
     
     return family_groups
 
 def validate_font_group(family_name, fonts):
     """Validate fonts in a group."""
-    # Check for duplicate styles
-    styles = [f['subfamily'] for f in fonts]
-    duplicates = set([s for s in styles if styles.count(s) > 1])
+    # Check for duplicate styles ('Semi Bold' and 'SemiBold' count as the same)
+    duplicates = duplicate_styles(fonts)
     
     if duplicates:
         print(f"⚠ WARNING [{family_name}]: Duplicate styles detected: {', '.join(duplicates)}")
@@ -162,45 +223,303 @@ def validate_font_group(family_name, fonts):
     
     return True
 
-def create_font_collection(family_name, font_info_list, output_path):
-    """Create TrueType Collection file for a font family."""
+def collapse_duplicates(family_name, fonts):
+    """Drop fonts whose table content is identical to an earlier font of the family."""
+    unique = {}
+    for info in fonts:
+        try:
+            key = font_digest(info.path)
+        except (OSError, ValueError) as e:
+            print(f"⚠ WARNING [{family_name}]: Can't compare {info.path.name}: {e}")
+            key = info.path
+        first = unique.setdefault(key, info)
+        if first is not info:
+            print(f"⚠ Skipping duplicate [{family_name}]: {info.path.name} (identical to {first.path.name})")
+    return list(unique.values())
+
+def create_font_collection(family_name, font_info_list, output_path, read_tables=None):
+    """Create TrueType Collection file for a font family.
+    
+    Member tables are copied as raw bytes and identical tables are stored
+    once. read_tables(info) returns (sfnt_version, {tag: bytes}) for a
+    member; by default info.path is memory-mapped, so members are paged in
+    from the file cache instead of being held in memory. Returns the number
+    of bytes saved by sharing, or None on failure.
+    """
     try:
         print(f"\n{'─'*60}")
         print(f"Creating: {family_name}.ttc")
         print(f"{'─'*60}")
         
-        # Load all fonts
-        fonts = []
-        for info in font_info_list:
-            print(f"  Loading: {info['path'].name}")
-            fonts.append(TTFont(str(info['path'])))
-        
-        # Create collection
-        collection = TTCollection()
-        collection.fonts = fonts
-        
-        # Save
-        collection.save(str(output_path))
-        
-        # Close all fonts
-        for font in fonts:
-            font.close()
+        with ExitStack() as mapped:
+            # Load raw tables of all fonts
+            members = []
+            with instrument.stage('load', path=str(output_path)):
+                for info in font_info_list:
+                    print(f"  Loading: {info.path.name}")
+                    if read_tables is None:
+                        members.append(mapped.enter_context(mapped_tables(info.path)))
+                    else:
+                        members.append(read_tables(info))
+            
+            # Save, writing each distinct table once; the output is replaced
+            # atomically so a crash never leaves a half-written TTC behind
+            with instrument.stage('save', path=str(output_path)):
+                with atomic_write(output_path) as f:
+                    saved_bytes = write_collection(f, members)
         
         # Get file size
         file_size = output_path.stat().st_size / 1024  # KB
         
         print(f"  ✓ Saved: {output_path.name}")
         print(f"  ✓ Size: {file_size:.2f} KB")
-        print(f"  ✓ Variants: {len(fonts)}")
+        print(f"  ✓ Shared tables saved: {saved_bytes / 1024:.2f} KB")
+        print(f"  ✓ Variants: {len(members)}")
         
-        return True
+        return saved_bytes
         
     except Exception as e:
         print(f"  ✗ ERROR: Failed to create collection: {e}")
-        return False
+        return None
+
+def estimate_family_memory(fonts):
+    """Estimate the peak memory (bytes) needed to build one family's collection."""
+    return MEMORY_FACTOR * sum(info.path.stat().st_size for info in fonts)
+
+def build_family(family_name, fonts, output_path):
+    """Create one family's collection in a worker process, capturing its report."""
+    report = io.StringIO()
+    with redirect_stdout(report):
+        saved_bytes = create_font_collection(family_name, fonts, output_path)
+    return saved_bytes, report.getvalue()
+
+def run_family_builds(builds, jobs, memory_budget, pool=None):
+    """Create the collections for builds, a list of (family_name, fonts, output_path).
+    
+    Returns {family_name: bytes saved, or None on failure}. With jobs > 1 the
+    families are built in worker processes, those of pool if one is given. A
+    family is only started while the estimated memory of all running builds
+    stays within memory_budget (bytes); a family larger than the whole budget
+    runs on its own. Reports are printed in family order either way.
+    """
+    results = {}
+    if jobs <= 1:
+        for family_name, fonts, output_path in builds:
+            results[family_name] = create_font_collection(family_name, fonts, output_path)
+        return results
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return run_family_builds(builds, jobs, memory_budget, pool)
+    
+    estimates = [estimate_family_memory(fonts) for _, fonts, _ in builds]
+    pending = list(range(len(builds)))
+    running = {}
+    in_use = 0
+    reports = {}
+    next_report = 0
+    
+    while pending or running:
+        # Start every pending family that still fits in the budget
+        for index in list(pending):
+            if len(running) >= jobs:
+                break
+            if running and in_use + estimates[index] > memory_budget:
+                continue
+            pending.remove(index)
+            running[pool.submit(instrument.timed, build_family, *builds[index])] = index
+            in_use += estimates[index]
+        
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = running.pop(future)
+            in_use -= estimates[index]
+            family_name = builds[index][0]
+            try:
+                (saved_bytes, report), stages = future.result()
+                instrument.replay(stages)
+            except Exception as e:
+                saved_bytes = None
+                report = f"\n  ✗ ERROR: Failed to create collection for {family_name}: {e}\n"
+            results[family_name] = saved_bytes
+            reports[index] = report
+        
+        # Print finished reports in family order
+        while next_report in reports:
+            print(reports.pop(next_report), end='')
+            next_report += 1
+    
+    return results
+
+def build_families(family_groups, export_folder, args, manifest, pool=None):
+    """Create the collections of family_groups in export_folder.
+    
+    With --incremental, families whose inputs match manifest are skipped and
+    manifest is updated for every family built. Returns (successful, failed,
+    skipped, {family_name: bytes saved}).
+    """
+    print(f"{'='*60}")
+    print(f"STEP 3: CREATING FONT COLLECTIONS")
+    print(f"{'='*60}")
+    
+    successful = 0
+    failed = 0
+    skipped = 0
+    saved_by_family = {}
+    family_inputs_by_name = {}
+    builds = []
+    
+    for family_name, fonts in sorted(family_groups.items()):
+        # Create output path
+        output_filename = f"{family_name}.ttc"
+        output_path = export_folder / output_filename
+        
+        # Checked on the file hashes (from the font index) before anything
+        # else reads the fonts, so up-to-date families cost no I/O
+        if args.incremental:
+            family_inputs_by_name[family_name] = family_inputs(fonts)
+            if manifest.get(family_name) == family_inputs_by_name[family_name] and output_path.exists():
+                print(f"\n✓ Up to date, skipping: {output_path.name}")
+                skipped += 1
+                continue
+        
+        # Identical fonts (e.g. the same file from two drops) are packed once
+        if not args.keep_duplicates:
+            fonts = collapse_duplicates(family_name, fonts)
+        
+        # Validate group
+        validate_font_group(family_name, fonts)
+        
+        # Check if output already exists
+        if output_path.exists():
+            print(f"\n⚠ WARNING: Output file already exists and will be overwritten:")
+            print(f"  {output_path.name}")
+        
+        builds.append((family_name, fonts, output_path))
+    
+    # Create collections
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    results = run_family_builds(builds, jobs, args.memory_budget * 1024 * 1024, pool)
+    
+    for family_name, fonts, output_path in builds:
+        saved_bytes = results[family_name]
+        if saved_bytes is not None:
+            instrument.file_event('save', output_path, members=len(fonts), saved_bytes=saved_bytes)
+            saved_by_family[family_name] = saved_bytes
+            successful += 1
+            if args.incremental:
+                manifest[family_name] = family_inputs_by_name[family_name]
+        else:
+            failed += 1
+            manifest.pop(family_name, None)
+    
+    return successful, failed, skipped, saved_by_family
+
+def load_manifest(export_folder):
+    """Load the per-family input hashes recorded by the last run."""
+    manifest_path = export_folder / MANIFEST_NAME
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠ WARNING: Ignoring unreadable manifest {manifest_path.name}: {e}")
+        return {}
+
+def save_manifest(export_folder, manifest):
+    """Write the manifest atomically."""
+    with atomic_write(export_folder / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def family_inputs(fonts):
+    """Map each member file name to its content hash."""
+    return {info.path.name: info.content_hash() for info in fonts}
+
+def watch_source(source_folder, export_folder, args, font_infos, manifest, watcher,
+                 font_index=None, pool=None):
+    """Rebuild the families whose fonts are added to, changed in or removed from
+    source_folder, batch by batch, until Ctrl+C.
+    
+    Only the fonts of a batch are read and renamed; the metadata of every
+    other font is kept from the earlier passes. watcher is created before the
+    first pass, so fonts dropped while it ran come up in the first batch.
+    """
+    infos = {info.path: info for info in font_infos}
+    watch.stop_on_sigterm()
+    print(f"Watching {source_folder} for new or changed fonts (Ctrl+C to stop)...")
+    batches = 0
+    try:
+        while True:
+            changed, removed = watcher.wait()
+            print(f"\n{'='*60}")
+            print(f"WATCH: {len(changed)} new or changed, {len(removed)} removed font file(s)")
+            print(f"{'='*60}")
+            
+            # Families that gain, change or lose a member are rebuilt
+            affected = set()
+            for path in changed + removed:
+                info = infos.pop(path, None)
+                if info is not None:
+                    affected.update(normalize_families([info.family]))
+            for path in removed:
+                print(f"⚠ Removed: {path.name}")
+            
+            new_infos = scan_fonts(changed, font_index)
+            if new_infos:
+                old_paths = [info.path for info in new_infos]
+                rename_font_files(new_infos, font_index)
+                # Renamed files are not new drops
+                watcher.accept(old_paths + [info.path for info in new_infos])
+            for info in new_infos:
+                infos[info.path] = info
+            affected.update(normalize_families([info.family for info in new_infos]))
+            affected.discard("")
+            
+            family_groups, _ = FontColumns(infos.values()).group()
+            batch_groups = {family_name: fonts for family_name, fonts in family_groups.items()
+                            if family_name in affected}
+            print()
+            successful, failed, skipped, _ = build_families(batch_groups, export_folder, args,
+                                                            manifest, pool)
+            for family_name in sorted(affected - set(family_groups)):
+                print(f"\n⚠ WARNING: No source fonts left for {family_name}.ttc (left in place)")
+                manifest.pop(family_name, None)
+            if args.incremental:
+                save_manifest(export_folder, manifest)
+            
+            batches += 1
+            print(f"\n✓ Batch {batches} done: {successful} built, {skipped} up to date, "
+                  f"{failed} failed")
+            print(f"Watching {source_folder} for new or changed fonts (Ctrl+C to stop)...")
+    except KeyboardInterrupt:
+        print(f"\n✓ Stopped watching after {batches} batch(es).")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Rename the fonts in '1_source' and pack each family into a .ttc in '2_export'.")
+    parser.add_argument('--no-index', action='store_true',
+                        help="Don't use the persistent font metadata index")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only rebuild families whose member fonts were added, removed or changed")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Families to build in parallel (0 = one per CPU, default: 1)")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Pack fonts with identical table content more than once")
+    parser.add_argument('--memory-budget', type=int, default=DEFAULT_MEMORY_BUDGET_MB, metavar='MB',
+                        help=f"Estimated memory all parallel builds may use together "
+                             f"(default: {DEFAULT_MEMORY_BUDGET_MB} MB)")
+    watch.add_arguments(parser)
+    instrument.add_arguments(parser)
+    return parser.parse_args()
 
 def main():
     """Main function to orchestrate the font assembly process."""
+    args = parse_args()
+    font_index = None
+    pool = None
+    instrument.configure_from_args("one_family_fonts_assembler", args)
+    instrument.record_startup()
+    
     print(f"\n{'='*60}")
     print(f"MULTI-FAMILY FONTS ASSEMBLER")
     print(f"{'='*60}")
@@ -221,16 +540,20 @@ def main():
         print(f"Source: {source_folder}")
         print(f"Export: {export_folder}")
         
+        # Snapshot the folder before listing it, so nothing dropped during the first pass is missed
+        watcher = (watch.FolderWatcher(source_folder, ('.ttf',), args.watch_interval,
+                                       args.watch_settle) if args.watch else None)
+        
         # Get all files
         all_files = list(source_folder.glob("*"))
         
-        if not all_files:
+        if not all_files and not args.watch:
             raise FontAssemblerError(f"No files found in '{source_folder}'!")
         
         # Filter TTF files (case insensitive)
         ttf_files = [f for f in all_files if f.suffix.lower() == '.ttf' and f.is_file()]
         
-        if not ttf_files:
+        if not ttf_files and not args.watch:
             raise FontAssemblerError("No .ttf files found in source folder!")
         
         # Check for non-TTF font files
@@ -244,41 +567,43 @@ def main():
         
         print(f"\nFound {len(ttf_files)} TTF file(s) to process")
         
+        # Read name/maxp metadata of every file exactly once
+        if not args.no_index:
+            font_index = FontIndex.open_default()
+        font_infos = scan_fonts(ttf_files, font_index)
+        
+        # Watch mode keeps one worker pool for the first pass and every batch
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        if args.watch and jobs > 1:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+        
         # STEP 1: Rename files to standard pattern
-        renamed_files = rename_font_files(ttf_files)
+        old_paths = [info.path for info in font_infos]
+        with instrument.stage('rename'):
+            font_infos = rename_font_files(font_infos, font_index)
+        if watcher is not None:
+            # Renamed files are not new drops
+            watcher.accept([path for old_path, info in zip(old_paths, font_infos)
+                            if old_path != info.path for path in (old_path, info.path)])
         
         # STEP 2: Group fonts by family
-        family_groups = group_fonts_by_family(renamed_files)
+        with instrument.stage('group'):
+            family_groups = group_fonts_by_family(font_infos)
         
-        if not family_groups:
+        if not family_groups and not args.watch:
             raise FontAssemblerError("No valid font families found after grouping!")
         
         # STEP 3: Create TTC files for each family
-        print(f"{'='*60}")
-        print(f"STEP 3: CREATING FONT COLLECTIONS")
-        print(f"{'='*60}")
+        manifest = load_manifest(export_folder) if args.incremental else {}
+        successful, failed, skipped, saved_by_family = build_families(
+            family_groups, export_folder, args, manifest, pool)
         
-        successful = 0
-        failed = 0
-        
-        for family_name, fonts in sorted(family_groups.items()):
-            # Validate group
-            validate_font_group(family_name, fonts)
-            
-            # Create output path
-            output_filename = f"{family_name}.ttc"
-            output_path = export_folder / output_filename
-            
-            # Check if output already exists
-            if output_path.exists():
-                print(f"\n⚠ WARNING: Output file already exists and will be overwritten:")
-                print(f"  {output_path.name}")
-            
-            # Create collection
-            if create_font_collection(family_name, fonts, output_path):
-                successful += 1
-            else:
-                failed += 1
+        if args.incremental:
+            # Forget families that no longer have any source fonts
+            for family_name in set(manifest) - set(family_groups):
+                print(f"\n⚠ WARNING: No source fonts left for {family_name}.ttc (left in place)")
+                del manifest[family_name]
+            save_manifest(export_folder, manifest)
         
         # Final summary
         print(f"\n{'='*60}")
@@ -286,12 +611,24 @@ def main():
         print(f"{'='*60}")
         print(f"Total families processed: {len(family_groups)}")
         print(f"Successful: {successful}")
+        if args.incremental:
+            print(f"Up to date (skipped): {skipped}")
         print(f"Failed: {failed}")
+        if saved_by_family:
+            print(f"Bytes saved by shared tables:")
+            for family_name, saved_bytes in saved_by_family.items():
+                print(f"  {family_name}: {saved_bytes / 1024:.2f} KB")
+            print(f"  Total: {sum(saved_by_family.values()) / 1024:.2f} KB")
         print(f"Output location: {export_folder}")
         print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*60}\n")
+        if instrument.enabled():
+            instrument.print_summary()
         
-        if failed > 0:
+        if args.watch:
+            watch_source(source_folder, export_folder, args, font_infos, manifest, watcher,
+                         font_index, pool)
+        elif failed > 0:
             sys.exit(1)
         
     except FontAssemblerError as e:
@@ -313,6 +650,13 @@ def main():
         traceback.print_exc()
         print(f"{'='*60}\n")
         sys.exit(1)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if font_index is not None:
+            font_index.close()
+        instrument.close()
 
 if __name__ == "__main__":
+    freeze_support()
     main()
@@ -0,0 +1,80 @@
+"""--resume extracts source fonts again whose extraction partly failed.
+
+    python -m unittest discover -s tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# The fonts tools live next to this folder, the sample fonts in the repo root
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = TOOLS_DIR.parent
+
+# Tests must not read from or write to the user's font index
+os.environ['FONT_INDEX_PATH'] = ''
+
+sys.path.insert(0, str(TOOLS_DIR))
+sys.path.insert(0, str(TOOLS_DIR / "font_disassembler"))
+import font_separator_multiple as disassembler
+from journal import ExtractionJournal
+
+SAMPLE_COLLECTION = "IBMPlexSans.ttc"
+
+# Member whose extraction fails in the first run
+FAILING_MEMBER = 1
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp()) / "!source+output"
+        self.root.mkdir()
+        self.source = self.root / SAMPLE_COLLECTION
+        shutil.copy2(REPO_DIR / SAMPLE_COLLECTION, self.source)
+        self.output_dir = self.root / self.source.stem
+
+    def tearDown(self):
+        shutil.rmtree(self.root.parent)
+
+    def run_disassembler(self, resume):
+        """Run one pass over the source folder like main does; returns its journal."""
+        disassembler._claimed_names.clear()
+        disassembler._ledger.clear()
+        disassembler._output_digests.clear()
+        journal = disassembler._journal = ExtractionJournal(self.root, resume=resume)
+        try:
+            disassembler.run_logged(disassembler.process_directory, self.root)
+        finally:
+            disassembler._journal = None
+            journal.close()
+        return journal
+
+    def extracted_files(self):
+        return sorted(path.name for path in self.output_dir.glob("*.ttf"))
+
+    def test_failed_member_is_extracted_on_resume(self):
+        copy_member = disassembler.copy_collection_member
+
+        def failing_copy(font_path, index, output_file, export=None):
+            if index == FAILING_MEMBER:
+                return "simulated failure", None
+            return copy_member(font_path, index, output_file, export)
+
+        with mock.patch.object(disassembler, 'copy_collection_member', failing_copy):
+            self.run_disassembler(resume=False)
+        partial = self.extracted_files()
+
+        journal = self.run_disassembler(resume=True)
+        self.assertEqual(journal.resumed_fonts, 0)
+        complete = self.extracted_files()
+        self.assertEqual(len(complete), len(partial) + 1)
+
+        # Once complete, the source is taken from the journal
+        journal = self.run_disassembler(resume=True)
+        self.assertEqual(journal.resumed_fonts, 1)
+        self.assertEqual(self.extracted_files(), complete)
+
+if __name__ == "__main__":
+    unittest.main()